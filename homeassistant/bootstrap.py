@@ -15,11 +15,12 @@ from homeassistant import (
     core, config as conf_util, config_entries, loader,
     components as core_components)
 from homeassistant.components import persistent_notification
-from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
-from homeassistant.setup import async_setup_component
+from homeassistant.const import (
+    CONF_SETUP_CONCURRENCY, EVENT_HOMEASSISTANT_CLOSE)
+from homeassistant.setup import async_setup_components
 from homeassistant.util.logging import AsyncHandler
 from homeassistant.util.package import async_get_user_site, get_user_site
-from homeassistant.util.yaml import clear_secret_cache
+from homeassistant.util.yaml import clear_secret_cache, clear_yaml_cache
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.signal import async_register_signal_handling
 
@@ -136,19 +137,11 @@ def async_from_config_dict(config: Dict[str, Any],
 
     _LOGGER.info("Home Assistant core initialized")
 
-    # stage 1
-    for component in components:
-        if component not in FIRST_INIT_COMPONENT:
-            continue
-        hass.async_add_job(async_setup_component(hass, component, config))
-
-    yield from hass.async_block_till_done()
-
-    # stage 2
-    for component in components:
-        if component in FIRST_INIT_COMPONENT:
-            continue
-        hass.async_add_job(async_setup_component(hass, component, config))
+    # setup components as soon as their dependencies are, after the
+    # components that have to be initialized first
+    yield from async_setup_components(
+        hass, components, config, FIRST_INIT_COMPONENT,
+        core_config.get(CONF_SETUP_CONCURRENCY))
 
     yield from hass.async_block_till_done()
 
@@ -209,6 +202,7 @@ def async_from_config_file(config_path: str,
         return None
     finally:
         clear_secret_cache()
+        clear_yaml_cache()
 
     hass = yield from async_from_config_dict(
         config_dict, hass, enable_log=False, skip_pip=skip_pip)
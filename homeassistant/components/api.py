@@ -9,23 +9,25 @@ import json
 import logging
 
 from aiohttp import web
+from aiohttp.web_exceptions import HTTPInternalServerError
 import async_timeout
 
 import homeassistant.core as ha
-import homeassistant.remote as rem
 from homeassistant.bootstrap import DATA_LOGGING
 from homeassistant.const import (
-    EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED,
+    EVENT_HOMEASSISTANT_STOP,
     HTTP_BAD_REQUEST, HTTP_CREATED, HTTP_NOT_FOUND,
     MATCH_ALL, URL_API, URL_API_COMPONENTS,
     URL_API_CONFIG, URL_API_DISCOVERY_INFO, URL_API_ERROR_LOG,
     URL_API_EVENTS, URL_API_SERVICES,
-    URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE,
-    __version__)
+    URL_API_STARTUP, URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM,
+    URL_API_TEMPLATE, __version__)
 from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.event_hub import async_get_event_hub
 from homeassistant.helpers.state import AsyncTrackStates
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.helpers import template
+from homeassistant.setup import async_get_timeline
 from homeassistant.components.http import HomeAssistantView
 
 DOMAIN = 'api'
@@ -51,6 +53,7 @@ def setup(hass, config):
     hass.http.register_view(APIDomainServicesView)
     hass.http.register_view(APIComponentsView)
     hass.http.register_view(APITemplateView)
+    hass.http.register_view(APIStartupView)
 
     log_path = hass.data.get(DATA_LOGGING, None)
     if log_path:
@@ -89,29 +92,32 @@ class APIEventStream(HomeAssistantView):
         if restrict:
             restrict = restrict.split(',') + [EVENT_HOMEASSISTANT_STOP]
 
-        @asyncio.coroutine
-        def forward_events(event):
+        @ha.callback
+        def forward_events(serialized):
             """Forward events to the open request."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
+            event = serialized.event
 
             if restrict and event.event_type not in restrict:
-                return
+                return None
 
             _LOGGER.debug('STREAM %s FORWARDING %s', id(stop_obj), event)
 
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
+            elif serialized.json is None:
+                return None
             else:
-                data = json.dumps(event, cls=rem.JSONEncoder)
+                data = serialized.json
 
-            yield from to_write.put(data)
+            to_write.put_nowait(data)
+            return True
 
         response = web.StreamResponse()
         response.content_type = 'text/event-stream'
         yield from response.prepare(request)
 
-        unsub_stream = hass.bus.async_listen(MATCH_ALL, forward_events)
+        subscription = async_get_event_hub(hass).async_subscribe(
+            MATCH_ALL, forward_events)
 
         try:
             _LOGGER.debug('STREAM %s ATTACHED', id(stop_obj))
@@ -140,7 +146,7 @@ class APIEventStream(HomeAssistantView):
 
         finally:
             _LOGGER.debug('STREAM %s RESPONSE CLOSED', id(stop_obj))
-            unsub_stream()
+            subscription.async_unsubscribe()
 
 
 class APIConfigView(HomeAssistantView):
@@ -184,7 +190,12 @@ class APIStatesView(HomeAssistantView):
     @ha.callback
     def get(self, request):
         """Get current states."""
-        return self.json(request.app['hass'].states.async_all())
+        try:
+            msg = request.app['hass'].states.async_all_json()
+        except TypeError as err:
+            _LOGGER.error('Unable to serialize states to JSON: %s', err)
+            raise HTTPInternalServerError
+        return self.json_encoded(msg)
 
 
 class APIEntityStateView(HomeAssistantView):
@@ -338,6 +349,18 @@ class APIComponentsView(HomeAssistantView):
         return self.json(request.app['hass'].config.components)
 
 
+class APIStartupView(HomeAssistantView):
+    """View to handle startup timeline requests."""
+
+    url = URL_API_STARTUP
+    name = "api:startup"
+
+    @ha.callback
+    def get(self, request):
+        """Get how long setting up components and platforms took."""
+        return self.json(async_get_timeline(request.app['hass']))
+
+
 class APITemplateView(HomeAssistantView):
     """View to handle requests."""
 
@@ -7,9 +7,9 @@ https://home-assistant.io/components/demo/
 import asyncio
 import time
 
-import homeassistant.bootstrap as bootstrap
 import homeassistant.core as ha
 from homeassistant.const import ATTR_ENTITY_ID, CONF_PLATFORM
+from homeassistant.setup import async_setup_component
 
 DEPENDENCIES = ['conversation', 'introduction', 'zone']
 DOMAIN = 'demo'
@@ -56,7 +56,7 @@ def async_setup(hass, config):
         hass.config.longitude = 117.22743
 
     tasks = [
-        bootstrap.async_setup_component(hass, 'sun')
+        async_setup_component(hass, 'sun')
     ]
 
     # Set up demo platforms
@@ -64,10 +64,10 @@ def async_setup(hass, config):
     for component in COMPONENTS_WITH_DEMO_PLATFORM:
         demo_config[component] = {CONF_PLATFORM: 'demo'}
         tasks.append(
-            bootstrap.async_setup_component(hass, component, demo_config))
+            async_setup_component(hass, component, demo_config))
 
     # Set up input select
-    tasks.append(bootstrap.async_setup_component(
+    tasks.append(async_setup_component(
         hass, 'input_select',
         {'input_select':
          {'living_room_preset': {'options': ['Visitors',
@@ -78,7 +78,7 @@ def async_setup(hass, config):
                         'name': 'Cook today',
                         'options': ['Paulus', 'Anne Therese']}}}))
     # Set up input boolean
-    tasks.append(bootstrap.async_setup_component(
+    tasks.append(async_setup_component(
         hass, 'input_boolean',
         {'input_boolean': {'notify': {
             'icon': 'mdi:car',
@@ -86,7 +86,7 @@ def async_setup(hass, config):
             'name': 'Notify Anne Therese is home'}}}))
 
     # Set up input boolean
-    tasks.append(bootstrap.async_setup_component(
+    tasks.append(async_setup_component(
         hass, 'input_number',
         {'input_number': {
             'noise_allowance': {'icon': 'mdi:bell-ring',
@@ -96,7 +96,7 @@ def async_setup(hass, config):
                                 'unit_of_measurement': 'dB'}}}))
 
     # Set up weblink
-    tasks.append(bootstrap.async_setup_component(
+    tasks.append(async_setup_component(
         hass, 'weblink',
         {'weblink': {'entities': [{'name': 'Router',
                                    'url': 'http://192.168.1.1'}]}}))
@@ -119,7 +119,7 @@ def async_setup(hass, config):
     tasks2 = []
 
     # Set up history graph
-    tasks2.append(bootstrap.async_setup_component(
+    tasks2.append(async_setup_component(
         hass, 'history_graph',
         {'history_graph': {'switches': {
             'name': 'Recent Switches',
@@ -130,7 +130,7 @@ def async_setup(hass, config):
     ))
 
     # Set up scripts
-    tasks2.append(bootstrap.async_setup_component(
+    tasks2.append(async_setup_component(
         hass, 'script',
         {'script': {
             'demo': {
@@ -152,7 +152,7 @@ def async_setup(hass, config):
             }}}))
 
     # Set up scenes
-    tasks2.append(bootstrap.async_setup_component(
+    tasks2.append(async_setup_component(
         hass, 'scene',
         {'scene': [
             {'name': 'Romantic lights',
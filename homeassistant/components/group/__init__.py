@@ -27,6 +27,8 @@ DOMAIN = 'group'
 
 ENTITY_ID_FORMAT = DOMAIN + '.{}'
 
+DATA_EXPANSIONS = 'group_expansions'
+
 CONF_ENTITIES = 'entities'
 CONF_VIEW = 'view'
 CONF_CONTROL = 'control'
@@ -193,6 +195,7 @@ def expand_entity_ids(hass, entity_ids):
     Async friendly.
     """
     found_ids = []
+    seen = set()
     for entity_id in entity_ids:
         if not isinstance(entity_id, str):
             continue
@@ -204,18 +207,14 @@ def expand_entity_ids(hass, entity_ids):
             domain, _ = ha.split_entity_id(entity_id)
 
             if domain == DOMAIN:
-                child_entities = get_entity_ids(hass, entity_id)
-                if entity_id in child_entities:
-                    child_entities = list(child_entities)
-                    child_entities.remove(entity_id)
-                found_ids.extend(
-                    ent_id for ent_id
-                    in expand_entity_ids(hass, child_entities)
-                    if ent_id not in found_ids)
-
+                members = _expand_group(hass, entity_id)
             else:
-                if entity_id not in found_ids:
-                    found_ids.append(entity_id)
+                members = (entity_id,)
+
+            for ent_id in members:
+                if ent_id not in seen:
+                    seen.add(ent_id)
+                    found_ids.append(ent_id)
 
         except AttributeError:
             # Raised by split_entity_id if entity_id is not a string
@@ -224,6 +223,65 @@ def expand_entity_ids(hass, entity_ids):
     return found_ids
 
 
+def _expand_group(hass, entity_id):
+    """Return the ordered members of a group with nested groups expanded.
+
+    Expansions are cached together with the member lists of the groups
+    they were built from, an expansion is only rebuilt once one of those
+    member lists changed. Async friendly.
+    """
+    expansions = hass.data.get(DATA_EXPANSIONS)
+    if expansions is None:
+        expansions = hass.data[DATA_EXPANSIONS] = {}
+
+    cached = expansions.get(entity_id)
+    if cached is not None:
+        dependencies, members = cached
+        if all(_group_members(hass, group_id) is group_members
+               for group_id, group_members in dependencies):
+            return members
+
+    dependencies = []
+    members = []
+    _walk_group(hass, entity_id, {entity_id}, dependencies, members, set())
+    members = tuple(members)
+    expansions[entity_id] = (tuple(dependencies), members)
+    return members
+
+
+def _walk_group(hass, entity_id, visited, dependencies, found_ids, seen):
+    """Add the members of a group to found_ids, depth first.
+
+    Every group is walked once, which also breaks cycles between groups.
+    """
+    group_members = _group_members(hass, entity_id)
+    dependencies.append((entity_id, group_members))
+
+    for ent_id in group_members or ():
+        if not isinstance(ent_id, str):
+            continue
+
+        ent_id = ent_id.lower()
+
+        if ent_id.startswith(DOMAIN + '.'):
+            if ent_id not in visited:
+                visited.add(ent_id)
+                _walk_group(hass, ent_id, visited, dependencies, found_ids,
+                            seen)
+
+        elif ent_id not in seen:
+            seen.add(ent_id)
+            found_ids.append(ent_id)
+
+
+def _group_members(hass, entity_id):
+    """Return the entity_id attribute of a group, None if not there."""
+    group = hass.states.get(entity_id)
+    if group is None:
+        return None
+    return group.attributes.get(ATTR_ENTITY_ID)
+
+
 @bind_hass
 def get_entity_ids(hass, entity_id, domain_filter=None):
     """Get members of this group.
@@ -415,6 +473,10 @@ class Group(Entity):
         self._order = order
         self._assumed_state = False
         self._async_unsub_state_changed = None
+        # Counted state and assumed state of the members by entity id
+        self._member_states = {}
+        self._on_count = 0
+        self._assumed_count = 0
 
     @staticmethod
     def create_group(hass, name, entity_ids=None, user_defined=True,
@@ -586,76 +648,75 @@ class Group(Entity):
         self._async_update_group_state(new_state)
         yield from self.async_update_ha_state()
 
-    @property
-    def _tracking_states(self):
-        """Return the states that the group is tracking."""
-        states = []
+    @callback
+    def _async_recount(self):
+        """Count the states of all members."""
+        self._member_states = {}
+        self._on_count = 0
+        self._assumed_count = 0
 
         for entity_id in self.tracking:
             state = self.hass.states.get(entity_id)
 
             if state is not None:
-                states.append(state)
+                self._async_count_member(state)
+
+    @callback
+    def _async_count_member(self, state):
+        """Replace the counted state of a member by its new state."""
+        old = self._member_states.get(state.entity_id)
+
+        if old is not None:
+            if old[0] == self.group_on:
+                self._on_count -= 1
+            if old[1]:
+                self._assumed_count -= 1
+
+        new = (state.state, bool(state.attributes.get(ATTR_ASSUMED_STATE)))
+        self._member_states[state.entity_id] = new
 
-        return states
+        if new[0] == self.group_on:
+            self._on_count += 1
+        if new[1]:
+            self._assumed_count += 1
 
     @callback
     def _async_update_group_state(self, tr_state=None):
         """Update group state.
 
-        Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        Optionally you can provide the only state changed since last update,
+        only that member is counted again instead of all of them.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
-        gr_on = self.group_on
-        gr_off = self.group_off
+        if tr_state is None:
+            self._async_recount()
+        else:
+            self._async_count_member(tr_state)
 
         # We have not determined type of group yet
-        if gr_on is None:
+        if self.group_on is None:
             if tr_state is None:
-                states = self._tracking_states
-
-                for state in states:
-                    gr_on, gr_off = \
-                        _get_group_on_off(state.state)
+                for entity_id in self.tracking:
+                    member = self._member_states.get(entity_id)
+                    if member is None:
+                        continue
+                    gr_on, gr_off = _get_group_on_off(member[0])
                     if gr_on is not None:
                         break
+                else:
+                    gr_on, gr_off = None, None
             else:
                 gr_on, gr_off = _get_group_on_off(tr_state.state)
 
-            if gr_on is not None:
-                self.group_on, self.group_off = gr_on, gr_off
-
-        # We cannot determine state of the group
-        if gr_on is None:
-            return
-
-        if tr_state is None or ((gr_state == gr_on and
-                                 tr_state.state == gr_off) or
-                                tr_state.state not in (gr_on, gr_off)):
-            if states is None:
-                states = self._tracking_states
-
-            if any(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
-
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
-
-        if tr_state is None or self._assumed_state and \
-           not tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            if states is None:
-                states = self._tracking_states
+            # We cannot determine state of the group
+            if gr_on is None:
+                return
 
-            self._assumed_state = any(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state
-                in states)
+            self.group_on, self.group_off = gr_on, gr_off
+            self._on_count = sum(
+                1 for member in self._member_states.values()
+                if member[0] == gr_on)
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+        self._state = self.group_on if self._on_count else self.group_off
+        self._assumed_state = self._assumed_count > 0
@@ -7,20 +7,27 @@ https://home-assistant.io/components/history/
 import asyncio
 from collections import defaultdict
 from datetime import timedelta
+from functools import partial
 from itertools import groupby
+import json
 import logging
+import threading
 import time
 
+from aiohttp import web
 import voluptuous as vol
 
 from homeassistant.const import (
-    HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE)
+    CONTENT_TYPE_JSON, HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES,
+    CONF_EXCLUDE, CONF_INCLUDE)
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import ATTR_HIDDEN
 from homeassistant.components.recorder.util import session_scope, execute
 import homeassistant.helpers.config_validation as cv
+from homeassistant.remote import JSONEncoder
+from homeassistant.util.async_ import run_coroutine_threadsafe
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +45,11 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+# Number of rows fetched from the database per round trip when streaming
+STREAM_CHUNK_SIZE = 1000
+# Number of chunks buffered between the database thread and the response
+STREAM_QUEUE_SIZE = 4
+
 
 def last_recorder_run(hass):
     """Retrieve the last closed recorder run from the database."""
@@ -66,17 +78,8 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
     from homeassistant.components.recorder.models import States
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
-            (States.domain.in_(SIGNIFICANT_DOMAINS) |
-             (States.last_changed == States.last_updated)) &
-            (States.last_updated > start_time))
-
-        if filters:
-            query = filters.apply(query, entity_ids)
-
-        if end_time is not None:
-            query = query.filter(States.last_updated < end_time)
-
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters)
         query = query.order_by(States.last_updated)
 
         states = (
@@ -94,6 +97,198 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
         include_start_time_state)
 
 
+def stream_significant_states(hass, start_time, end_time=None,
+                              entity_ids=None, filters=None,
+                              include_start_time_state=True, compact=False):
+    """Yield the significant states during a period as chunks of JSON.
+
+    Joined together the chunks form the same list of per entity state lists
+    as returned by the history API, but entities are ordered by entity id.
+    Rows are fetched with a server side cursor in batches of
+    STREAM_CHUNK_SIZE and written out without creating State objects.
+
+    In compact mode every entity is an object with the arrays
+    ``last_updated`` (UNIX timestamps) and ``state``, plus ``attributes``
+    holding ``[index, attributes]`` pairs for the points where the
+    attributes changed.
+
+    This generator does blocking I/O and should not run in the event loop.
+    """
+    from homeassistant.components.recorder.models import (
+        States, process_timestamp)
+
+    start_states = {}
+    if include_start_time_state:
+        for state in get_states(hass, start_time, entity_ids,
+                                filters=filters):
+            start_states[state.entity_id] = (
+                state.entity_id, state.state,
+                json.dumps(dict(state.attributes), cls=JSONEncoder),
+                start_time, start_time)
+    pending_start = sorted(start_states)
+    pending_start.reverse()
+
+    writer = _CompactWriter() if compact else _StatesWriter()
+    yield '['
+
+    with session_scope(hass=hass) as session:
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters)
+        query = query.order_by(States.entity_id, States.last_updated) \
+            .yield_per(STREAM_CHUNK_SIZE)
+
+        decoded = {}
+        for row in query:
+            shared_attrs = row.shared_attrs
+            attributes = decoded.get(shared_attrs)
+            if attributes is None:
+                # Attributes rarely change between consecutive rows
+                try:
+                    attributes = json.loads(shared_attrs)
+                except ValueError:
+                    _LOGGER.exception("Error converting row to state: %s",
+                                      row)
+                    continue
+                decoded = {shared_attrs: attributes}
+
+            if attributes.get(ATTR_HIDDEN, False) or (
+                    row.domain == 'script' and
+                    not attributes.get(script.ATTR_CAN_CANCEL)):
+                continue
+
+            if row.entity_id != writer.entity_id:
+                # Entities with only a start state sort before this one
+                while pending_start and pending_start[-1] < row.entity_id:
+                    writer.add(start_states[pending_start.pop()])
+                if pending_start and pending_start[-1] == row.entity_id:
+                    writer.add(start_states[pending_start.pop()])
+
+            writer.add((row.entity_id, row.state, shared_attrs,
+                        process_timestamp(row.last_changed),
+                        process_timestamp(row.last_updated)))
+
+            if writer.buffered >= STREAM_CHUNK_SIZE:
+                yield writer.flush()
+
+    while pending_start:
+        writer.add(start_states[pending_start.pop()])
+        if writer.buffered >= STREAM_CHUNK_SIZE:
+            yield writer.flush()
+
+    yield writer.close() + ']'
+
+
+class _StatesWriter(object):
+    """Write points as lists of full state dictionaries."""
+
+    def __init__(self):
+        """Initialize the writer."""
+        self.entity_id = None
+        self.buffered = 0
+        self._parts = []
+
+    def add(self, point):
+        """Add a point to the output."""
+        entity_id, state, attributes, last_changed, last_updated = point
+
+        if entity_id == self.entity_id:
+            self._parts.append(',')
+        else:
+            if self.entity_id is not None:
+                self._parts.append('],')
+            self._parts.append('[')
+            self.entity_id = entity_id
+
+        self._parts.append(
+            '{{"attributes": {}, "entity_id": {}, "last_changed": {}, '
+            '"last_updated": {}, "state": {}}}'.format(
+                attributes, json.dumps(entity_id),
+                json.dumps(last_changed.isoformat()),
+                json.dumps(last_updated.isoformat()), json.dumps(state)))
+        self.buffered += 1
+
+    def flush(self):
+        """Return the buffered output."""
+        output = ''.join(self._parts)
+        self._parts = []
+        self.buffered = 0
+        return output
+
+    def close(self):
+        """Return the remaining output."""
+        if self.entity_id is not None:
+            self._parts.append(']')
+        return self.flush()
+
+
+class _CompactWriter(object):
+    """Write points as per entity columns."""
+
+    def __init__(self):
+        """Initialize the writer."""
+        self.entity_id = None
+        # Points of completed entities that were not flushed yet
+        self.buffered = 0
+        self._output = []
+        self._separator_pending = False
+        self._last_attributes = None
+        self._last_updated = []
+        self._states = []
+        self._attributes = []
+
+    def add(self, point):
+        """Add a point to the output."""
+        entity_id, state, attributes, _, last_updated = point
+
+        if entity_id != self.entity_id:
+            self._end_entity()
+            self.entity_id = entity_id
+
+        if attributes != self._last_attributes:
+            self._attributes.append(
+                '[{}, {}]'.format(len(self._states), attributes))
+            self._last_attributes = attributes
+
+        self._last_updated.append(last_updated.timestamp())
+        self._states.append(state)
+
+    def _end_entity(self):
+        """Move the columns of the current entity to the output."""
+        if self.entity_id is None:
+            return
+
+        if self._separator_pending:
+            self._output.append(',')
+        self._separator_pending = True
+        self.buffered += len(self._states)
+        self._output.append(
+            '{{"attributes": [{}], "entity_id": {}, "last_updated": {}, '
+            '"state": {}}}'.format(
+                ', '.join(self._attributes), json.dumps(self.entity_id),
+                json.dumps(self._last_updated), json.dumps(self._states)))
+        self._last_attributes = None
+        self._last_updated = []
+        self._states = []
+        self._attributes = []
+
+    def flush(self):
+        """Return the output of the entities that are complete.
+
+        The columns of an entity are only written once the entity is done.
+        """
+        output = ''.join(self._output)
+        self._output = []
+        self.buffered = 0
+        return output
+
+    def close(self):
+        """Return the remaining output."""
+        self._end_entity()
+        output = ''.join(self._output)
+        self._output = []
+        return output
+
+
 def state_changes_during_period(hass, start_time, end_time=None,
                                 entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
@@ -253,6 +448,25 @@ def states_to_json(
     return result
 
 
+def _significant_states_query(session, start_time, end_time, entity_ids,
+                              filters):
+    """Return the query for significant states during a period."""
+    from homeassistant.components.recorder.models import States
+
+    query = session.query(States).filter(
+        (States.domain.in_(SIGNIFICANT_DOMAINS) |
+         (States.last_changed == States.last_updated)) &
+        (States.last_updated > start_time))
+
+    if filters:
+        query = filters.apply(query, entity_ids)
+
+    if end_time is not None:
+        query = query.filter(States.last_updated < end_time)
+
+    return query
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = list(get_states(hass, utc_point_in_time, (entity_id,), run))
@@ -330,6 +544,23 @@ class HistoryPeriodView(HomeAssistantView):
 
         hass = request.app['hass']
 
+        if 'stream' in request.query or 'compact' in request.query:
+            chunks = partial(
+                stream_significant_states, hass, start_time, end_time,
+                entity_ids, self.filters, include_start_time_state,
+                'compact' in request.query)
+
+            if 'stream' in request.query:
+                response = yield from _async_stream_response(
+                    hass, request, chunks)
+            else:
+                body = yield from hass.async_add_job(
+                    lambda: ''.join(chunks()))
+                response = web.Response(
+                    body=body.encode('UTF-8'), content_type=CONTENT_TYPE_JSON)
+                response.enable_compression()
+            return response
+
         result = yield from hass.async_add_job(
             get_significant_states, hass, start_time, end_time,
             entity_ids, self.filters, include_start_time_state)
@@ -357,6 +588,52 @@ class HistoryPeriodView(HomeAssistantView):
         return response
 
 
+async def _async_stream_response(hass, request, chunks):
+    """Write the chunks produced in a worker thread to a chunked response.
+
+    At most STREAM_QUEUE_SIZE chunks are buffered, the worker waits for the
+    client to catch up.
+    """
+    response = web.StreamResponse()
+    response.content_type = CONTENT_TYPE_JSON
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    done = object()
+    to_write = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE, loop=hass.loop)
+    cancelled = threading.Event()
+
+    def produce():
+        """Read the chunks and hand them to the event loop."""
+        try:
+            for chunk in chunks():
+                if cancelled.is_set():
+                    return
+                run_coroutine_threadsafe(
+                    to_write.put(chunk), hass.loop).result()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error streaming history")
+        finally:
+            run_coroutine_threadsafe(to_write.put(done), hass.loop)
+
+    hass.async_add_job(produce)
+
+    try:
+        while True:
+            chunk = await to_write.get()
+            if chunk is done:
+                break
+            await response.write(chunk.encode('UTF-8'))
+    finally:
+        # Unblock the worker if the client went away
+        cancelled.set()
+        while not to_write.empty():
+            to_write.get_nowait()
+
+    await response.write_eof()
+    return response
+
+
 class Filters(object):
     """Container for the configured include and exclude filters."""
 
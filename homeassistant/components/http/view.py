@@ -32,14 +32,17 @@ class HomeAssistantView(object):
     def json(self, result, status_code=200, headers=None):
         """Return a JSON response."""
         try:
-            msg = json.dumps(
-                result, sort_keys=True, cls=rem.JSONEncoder).encode('UTF-8')
+            msg = json.dumps(result, sort_keys=True, cls=rem.JSONEncoder)
         except TypeError as err:
             _LOGGER.error('Unable to serialize to JSON: %s\n%s', err, result)
             raise HTTPInternalServerError
+        return self.json_encoded(msg, status_code, headers)
+
+    def json_encoded(self, msg, status_code=200, headers=None):
+        """Return a response with an already encoded JSON string."""
         response = web.Response(
-            body=msg, content_type=CONTENT_TYPE_JSON, status=status_code,
-            headers=headers)
+            body=msg.encode('UTF-8'), content_type=CONTENT_TYPE_JSON,
+            status=status_code, headers=headers)
         response.enable_compression()
         return response
 
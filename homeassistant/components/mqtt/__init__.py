@@ -6,14 +6,15 @@ https://home-assistant.io/components/mqtt/
 """
 import asyncio
 from itertools import groupby
-from typing import Optional, Any, Union, Callable, List, cast  # noqa: F401
+from typing import (  # noqa: F401
+    Optional, Any, Union, Callable, Dict, List, Tuple, cast)
 from operator import attrgetter
 import logging
 import os
 import socket
 import time
 import ssl
-import re
+import threading
 import requests.certs
 import attr
 
@@ -467,6 +468,13 @@ class MQTT(object):
         self.port = port
         self.keepalive = keepalive
         self.subscriptions = []  # type: List[Subscription]
+        self._subscription_trie = TopicTrie()
+        # Messages received by the paho thread waiting for the event loop
+        self._pending_messages = []  # type: List[Any]
+        self._pending_messages_lock = threading.Lock()
+        self.message_batches = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
         self.birth_message = birth_message
         self._mqttc = None  # type: mqtt.Client
         self._paho_lock = asyncio.Lock(loop=hass.loop)
@@ -555,6 +563,7 @@ class MQTT(object):
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._subscription_trie.add(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -564,6 +573,7 @@ class MQTT(object):
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._subscription_trie.remove(subscription)
 
             if any(other.topic == topic for other in self.subscriptions):
                 # Other subscriptions on topic remaining - don't unsubscribe.
@@ -621,17 +631,43 @@ class MQTT(object):
                 self.async_publish(*attr.astuple(self.birth_message)))
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are buffered and the event loop is only woken up when the
+        buffer was empty, so a flood of messages is handled in batches.
+        """
+        with self._pending_messages_lock:
+            self._pending_messages.append(msg)
+            if len(self._pending_messages) > 1:
+                # The loop has already been asked to process the buffer
+                return
+
+        self.hass.loop.call_soon_threadsafe(self._mqtt_handle_messages)
+
+    @callback
+    def _mqtt_handle_messages(self) -> None:
+        """Process all buffered messages."""
+        with self._pending_messages_lock:
+            messages = self._pending_messages
+            self._pending_messages = []
+
+        self.message_batches += 1
+        self.last_batch_size = len(messages)
+        self.max_batch_size = max(self.max_batch_size, len(messages))
+        if len(messages) > 1:
+            _LOGGER.debug("Processing batch of %d messages", len(messages))
+
+        for msg in messages:
+            try:
+                self._mqtt_handle_message(msg)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", msg.topic)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
         _LOGGER.debug("Received message on %s: %s", msg.topic, msg.payload)
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
-
+        for subscription in self._subscription_trie.match(msg.topic):
             payload = msg.payload  # type: SubscribePayloadType
             if subscription.encoding is not None:
                 try:
@@ -680,25 +716,94 @@ def _raise_on_error(result_code: int) -> None:
             'Error talking to MQTT: {}'.format(mqtt.error_string(result_code)))
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    reg_ex_parts = []  # type: List[str]
-    suffix = ""
-    if subscription.endswith('#'):
-        subscription = subscription[:-2]
-        suffix = "(.*)"
-    sub_parts = subscription.split('/')
-    for sub_part in sub_parts:
-        if sub_part == "+":
-            reg_ex_parts.append(r"([^\/]+)")
-        else:
-            reg_ex_parts.append(re.escape(sub_part))
+class _TopicNode(object):
+    """A level in the topic trie."""
 
-    reg_ex = "^" + (r'\/'.join(reg_ex_parts)) + suffix + "$"
+    __slots__ = ['children', 'subscriptions', 'subtree_subscriptions']
 
-    reg = re.compile(reg_ex)
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children = {}  # type: Dict[str, _TopicNode]
+        # Subscriptions for the topic ending at this level
+        self.subscriptions = []  # type: List[Subscription]
+        # Subscriptions ending with the multi level wildcard at this level
+        self.subtree_subscriptions = []  # type: List[Subscription]
 
-    return reg.match(topic) is not None
+    @property
+    def is_empty(self) -> bool:
+        """Return if the node holds no subscriptions or children."""
+        return not (self.children or self.subscriptions or
+                    self.subtree_subscriptions)
+
+
+class TopicTrie(object):
+    """Index subscriptions by topic level to match incoming messages.
+
+    Matching a topic only visits the branches for its levels and the single
+    level wildcards, so the cost depends on the topic depth instead of the
+    number of subscriptions.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root = _TopicNode()
+
+    def add(self, subscription: Subscription) -> None:
+        """Add a subscription."""
+        node = self._root
+        for level in subscription.topic.split('/'):
+            if level == '#':
+                node.subtree_subscriptions.append(subscription)
+                return
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.subscriptions.append(subscription)
+
+    def remove(self, subscription: Subscription) -> None:
+        """Remove a subscription and prune levels that became empty."""
+        path = []  # type: List[Tuple[_TopicNode, str]]
+        node = self._root
+        for level in subscription.topic.split('/'):
+            if level == '#':
+                node.subtree_subscriptions.remove(subscription)
+                break
+            path.append((node, level))
+            node = node.children[level]
+        else:
+            node.subscriptions.remove(subscription)
+
+        for parent, level in reversed(path):
+            if not parent.children[level].is_empty:
+                break
+            del parent.children[level]
+
+    def match(self, topic: str) -> List[Subscription]:
+        """Return the subscriptions matching topic."""
+        matches = []  # type: List[Subscription]
+        nodes = [self._root]
+
+        for level in topic.split('/'):
+            next_nodes = []
+            for node in nodes:
+                matches.extend(node.subtree_subscriptions)
+                child = node.children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+                child = node.children.get('+')
+                if child is not None:
+                    next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return matches
+
+        for node in nodes:
+            matches.extend(node.subscriptions)
+            # The multi level wildcard also matches the parent level
+            matches.extend(node.subtree_subscriptions)
+
+        return matches
 
 
 class MqttAvailability(Entity):
@@ -8,7 +8,7 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/recorder/
 """
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime, timedelta
 import logging
@@ -58,9 +58,21 @@ CONF_DB_URL = 'db_url'
 CONF_PURGE_KEEP_DAYS = 'purge_keep_days'
 CONF_PURGE_INTERVAL = 'purge_interval'
 CONF_EVENT_TYPES = 'event_types'
+CONF_COMMIT_INTERVAL = 'commit_interval'
+CONF_MAX_BATCH_SIZE = 'max_batch_size'
+CONF_MAX_QUEUE_SIZE = 'max_queue_size'
 
 CONNECT_RETRY_WAIT = 3
 
+DEFAULT_COMMIT_INTERVAL = 0
+DEFAULT_MAX_BATCH_SIZE = 1000
+DEFAULT_MAX_QUEUE_SIZE = 30000
+
+METRICS_INTERVAL = timedelta(seconds=30)
+
+# Number of shared attribute ids remembered to avoid database lookups
+ATTRIBUTES_ID_CACHE_SIZE = 2048
+
 FILTER_SCHEMA = vol.Schema({
     vol.Optional(CONF_EXCLUDE, default={}): vol.Schema({
         vol.Optional(CONF_DOMAINS): vol.All(cv.ensure_list, [cv.string]),
@@ -80,6 +92,12 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_INTERVAL, default=1):
             vol.All(vol.Coerce(int), vol.Range(min=0)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MAX_BATCH_SIZE, default=DEFAULT_MAX_BATCH_SIZE):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_MAX_QUEUE_SIZE, default=DEFAULT_MAX_QUEUE_SIZE):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
     })
 }, extra=vol.ALLOW_EXTRA)
 
@@ -117,6 +135,9 @@ def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     conf = config.get(DOMAIN, {})
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_interval = conf.get(CONF_COMMIT_INTERVAL, DEFAULT_COMMIT_INTERVAL)
+    max_batch_size = conf.get(CONF_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE)
+    max_queue_size = conf.get(CONF_MAX_QUEUE_SIZE, DEFAULT_MAX_QUEUE_SIZE)
 
     db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
@@ -127,7 +148,9 @@ def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     exclude = conf.get(CONF_EXCLUDE, {})
     instance = hass.data[DATA_INSTANCE] = Recorder(
         hass=hass, keep_days=keep_days, purge_interval=purge_interval,
-        uri=db_url, include=include, exclude=exclude)
+        uri=db_url, include=include, exclude=exclude,
+        commit_interval=commit_interval, max_batch_size=max_batch_size,
+        max_queue_size=max_queue_size)
     instance.async_initialize()
     instance.start()
 
@@ -151,13 +174,19 @@ class Recorder(threading.Thread):
 
     def __init__(self, hass: HomeAssistant, keep_days: int,
                  purge_interval: int, uri: str,
-                 include: Dict, exclude: Dict) -> None:
+                 include: Dict, exclude: Dict,
+                 commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name='Recorder')
 
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
         self.queue = queue.Queue()  # type: Any
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
@@ -172,10 +201,42 @@ class Recorder(threading.Thread):
 
         self.get_session = None
 
+        self.last_batch_size = 0
+        self.last_batch_latency = None  # type: Optional[float]
+
+        # Most recently used shared attributes JSON mapped to their row id
+        self._attributes_ids = OrderedDict()  # type: OrderedDict
+
+        # Entity id mapped to [last queued state event, newest state event]
+        self._queued_states = {}  # type: Dict[str, list]
+        self._queued_states_lock = threading.Lock()
+        self.coalesced = 0
+        self.dropped = 0
+        self._overflowing = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of items waiting to be processed."""
+        return self.queue.qsize()
+
     @callback
     def async_initialize(self):
         """Initialize the recorder."""
         self.hass.bus.async_listen(MATCH_ALL, self.event_listener)
+        self.hass.helpers.event.async_track_time_interval(
+            self.async_log_metrics, METRICS_INTERVAL)
+
+    @callback
+    def async_log_metrics(self, now=None):
+        """Log the queue metrics if debug logging is enabled."""
+        if not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+
+        _LOGGER.debug("Queue holds %d of max %d events, %d state changes "
+                      "coalesced, %d events dropped, last batch of %d events "
+                      "took %s seconds", self.queue_depth,
+                      self.max_queue_size, self.coalesced, self.dropped,
+                      self.last_batch_size, self.last_batch_latency)
 
     def do_adhoc_purge(self, **kwargs):
         """Trigger an adhoc purge retaining keep_days worth of data."""
@@ -186,9 +247,8 @@ class Recorder(threading.Thread):
 
     def run(self):
         """Start processing events to save."""
-        from .models import States, Events
+        from .models import Events
         from homeassistant.components import persistent_notification
-        from sqlalchemy import exc
 
         tries = 1
         connected = False
@@ -278,8 +338,10 @@ class Recorder(threading.Thread):
 
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
+        # Control messages (stop, purge) dequeued while draining a batch
+        carried = []
         while True:
-            event = self.queue.get()
+            event = carried.pop() if carried else self.queue.get()
 
             if event is None:
                 self._close_run()
@@ -287,55 +349,210 @@ class Recorder(threading.Thread):
                 self.queue.task_done()
                 return
             elif isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
-                self.queue.task_done()
-                continue
-            elif event.event_type == EVENT_TIME_CHANGED:
-                self.queue.task_done()
-                continue
-            elif event.event_type in self.exclude_t:
+                if not purge.purge_old_data(
+                        self, event.keep_days, event.repack):
+                    # Write the events that came in before purging more
+                    self.queue.put(event)
+                # Purging may have removed shared attributes
+                self._attributes_ids.clear()
                 self.queue.task_done()
                 continue
 
-            entity_id = event.data.get(ATTR_ENTITY_ID)
-            if entity_id is not None:
-                if not self.entity_filter(entity_id):
-                    self.queue.task_done()
-                    continue
+            batch = [self._dequeued(event)]
+            dequeued = 1
 
-            tries = 1
-            updated = False
-            while not updated and tries <= 10:
-                if tries != 1:
-                    time.sleep(CONNECT_RETRY_WAIT)
+            # Drain whatever else is waiting (up to the commit interval) so
+            # the whole batch is written in a single transaction.
+            deadline = time.monotonic() + self.commit_interval
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
                 try:
-                    with session_scope(session=self.get_session()) as session:
-                        dbevent = Events.from_event(event)
-                        session.add(dbevent)
-                        session.flush()
+                    if timeout > 0:
+                        event = self.queue.get(timeout=timeout)
+                    else:
+                        event = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if event is None or isinstance(event, PurgeTask):
+                    carried.append(event)
+                    break
+
+                dequeued += 1
+                batch.append(self._dequeued(event))
+
+            self._commit_batch(batch)
+
+            for _ in range(dequeued):
+                self.queue.task_done()
+
+    def _should_record(self, event):
+        """Return if an event should be written to the database."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return False
+        elif event.event_type in self.exclude_t:
+            return False
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        if entity_id is not None and not self.entity_filter(entity_id):
+            return False
+
+        return True
+
+    def _dequeued(self, event):
+        """Return the event to record for an event taken from the queue.
+
+        State changes that arrived while the queue was full replace the
+        last queued state change of their entity.
+        """
+        if event.event_type != EVENT_STATE_CHANGED:
+            return event
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        with self._queued_states_lock:
+            queued = self._queued_states.get(entity_id)
+            if queued is None or queued[0] is not event:
+                return event
+            del self._queued_states[entity_id]
+        return queued[1]
+
+    def _commit_batch(self, batch):
+        """Write a batch of events and states in a single transaction."""
+        from .models import States, Events
+        from sqlalchemy import exc
+
+        start = time.perf_counter()
+        tries = 1
+        updated = False
+        while not updated and tries <= 10:
+            if tries != 1:
+                time.sleep(CONNECT_RETRY_WAIT)
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    dbevents = [Events.from_event(event) for event in batch]
+                    session.add_all(dbevents)
 
+                    dbstates = []
+                    for event, dbevent in zip(batch, dbevents):
                         if event.event_type == EVENT_STATE_CHANGED:
-                            dbstate = States.from_event(event)
-                            dbstate.event_id = dbevent.event_id
-                            session.add(dbstate)
-                    updated = True
+                            dbstates.append(
+                                (dbevent, States.from_event(event)))
+
+                    new_attributes = self._add_shared_attributes(
+                        session, dbstates)
+
+                    # A single flush assigns all primary keys at once
+                    session.flush()
+                    new_attributes_ids = {
+                        shared_attrs: dbattributes.attributes_id
+                        for shared_attrs, dbattributes
+                        in new_attributes.items()}
+
+                    for dbevent, dbstate in dbstates:
+                        dbstate.event_id = dbevent.event_id
+                        if dbstate.attributes_id is None:
+                            dbstate.attributes_id = new_attributes_ids[
+                                dbstate.attributes]
+                        dbstate.attributes = None
+
+                    if dbstates:
+                        session.bulk_save_objects(
+                            dbstate for _, dbstate in dbstates)
+                updated = True
+
+                for shared_attrs, attributes_id in new_attributes_ids.items():
+                    self._cache_attributes_id(shared_attrs, attributes_id)
+
+            except exc.OperationalError as err:
+                _LOGGER.error("Error in database connectivity: %s. "
+                              "(retrying in %s seconds)", err,
+                              CONNECT_RETRY_WAIT)
+                tries += 1
+
+        if not updated:
+            _LOGGER.error("Error in database update. Could not save "
+                          "after %d tries. Giving up", tries)
+
+        self.last_batch_size = len(batch)
+        self.last_batch_latency = time.perf_counter() - start
+        _LOGGER.debug("Committed %d events in %fs, %d waiting in queue",
+                      self.last_batch_size, self.last_batch_latency,
+                      self.queue_depth)
 
-                except exc.OperationalError as err:
-                    _LOGGER.error("Error in database connectivity: %s. "
-                                  "(retrying in %s seconds)", err,
-                                  CONNECT_RETRY_WAIT)
-                    tries += 1
+    def _add_shared_attributes(self, session, dbstates):
+        """Point states at shared attributes, adding the missing ones.
 
-            if not updated:
-                _LOGGER.error("Error in database update. Could not save "
-                              "after %d tries. Giving up", tries)
+        Returns the attributes added to the session, keyed by their JSON.
+        """
+        from .models import StateAttributes
 
-            self.queue.task_done()
+        new_attributes = {}
+        for _, dbstate in dbstates:
+            shared_attrs = dbstate.attributes
+            if shared_attrs in new_attributes:
+                continue
+
+            attributes_id = self._attributes_ids.get(shared_attrs)
+            if attributes_id is None:
+                attrs_hash = StateAttributes.hash_shared_attrs(shared_attrs)
+                row = session.query(StateAttributes.attributes_id).filter(
+                    (StateAttributes.hash == attrs_hash) &
+                    (StateAttributes.shared_attrs == shared_attrs)).first()
+
+                if row is None:
+                    dbattributes = StateAttributes(
+                        hash=attrs_hash, shared_attrs=shared_attrs)
+                    session.add(dbattributes)
+                    new_attributes[shared_attrs] = dbattributes
+                    continue
+
+                attributes_id = row[0]
+
+            self._cache_attributes_id(shared_attrs, attributes_id)
+            dbstate.attributes_id = attributes_id
+
+        return new_attributes
+
+    def _cache_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the row id of shared attributes."""
+        self._attributes_ids[shared_attrs] = attributes_id
+        self._attributes_ids.move_to_end(shared_attrs)
+        if len(self._attributes_ids) > ATTRIBUTES_ID_CACHE_SIZE:
+            self._attributes_ids.popitem(last=False)
 
     @callback
     def event_listener(self, event):
-        """Listen for new events and put them in the process queue."""
-        self.queue.put(event)
+        """Listen for new events and put them in the process queue.
+
+        When the queue is full a state change replaces the queued state
+        change of the same entity, if there is one. Other events are
+        dropped until the recorder catches up.
+        """
+        if not self._should_record(event):
+            return
+
+        is_state = event.event_type == EVENT_STATE_CHANGED
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+
+        with self._queued_states_lock:
+            if self.queue.qsize() >= self.max_queue_size:
+                queued = self._queued_states.get(entity_id) \
+                    if is_state else None
+                if queued is not None:
+                    queued[1] = event
+                    self.coalesced += 1
+                    return
+                if not self._overflowing:
+                    _LOGGER.warning("Recorder queue is full with %d events, "
+                                    "dropping events", self.queue.qsize())
+                    self._overflowing = True
+                self.dropped += 1
+                return
+
+            self._overflowing = False
+            if is_state:
+                self._queued_states[entity_id] = [event, event]
+            self.queue.put(event)
 
     def block_till_done(self):
         """Block till all events processed."""
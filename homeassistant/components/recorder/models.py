@@ -2,11 +2,13 @@
 import json
 from datetime import datetime
 import logging
+import zlib
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text,
-    distinct)
+    BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String,
+    Text, distinct)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import Event, EventOrigin, State, split_entity_id
@@ -16,7 +18,7 @@ from homeassistant.remote import JSONEncoder
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 5
+SCHEMA_VERSION = 6
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,7 +49,7 @@ class Events(Base):  # type: ignore
                 self.event_type,
                 json.loads(self.event_data),
                 EventOrigin(self.origin),
-                _process_timestamp(self.time_fired)
+                process_timestamp(self.time_fired)
             )
         except ValueError:
             # When json.loads fails
@@ -55,6 +57,28 @@ class Events(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):   # type: ignore
+    """State attributes shared between state changes."""
+
+    __tablename__ = 'state_attributes'
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    _decoded = None
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash used to look up shared attributes."""
+        return zlib.crc32(shared_attrs.encode('utf-8'))
+
+    def to_native(self):
+        """Return the attributes, decoding them once per session."""
+        if self._decoded is None:
+            self._decoded = json.loads(self.shared_attrs)
+        return self._decoded
+
+
 class States(Base):   # type: ignore
     """State change history."""
 
@@ -65,6 +89,8 @@ class States(Base):   # type: ignore
     state = Column(String(255))
     attributes = Column(Text)
     event_id = Column(Integer, ForeignKey('events.event_id'), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey('state_attributes.attributes_id'), index=True)
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow,
                           index=True)
@@ -76,6 +102,9 @@ class States(Base):   # type: ignore
         Index(
             'ix_states_entity_id_last_updated', 'entity_id', 'last_updated'),)
 
+    # Loaded in the same query, states sharing attributes share the object
+    state_attributes = relationship(StateAttributes, lazy='joined')
+
     @staticmethod
     def from_event(event):
         """Create object from a state_changed event."""
@@ -101,14 +130,25 @@ class States(Base):   # type: ignore
 
         return dbstate
 
+    @property
+    def shared_attrs(self):
+        """Return the attributes as JSON, wherever they are stored."""
+        if self.state_attributes is not None:
+            return self.state_attributes.shared_attrs
+        return self.attributes
+
     def to_native(self):
         """Convert to an HA state object."""
         try:
+            if self.state_attributes is not None:
+                attributes = self.state_attributes.to_native()
+            else:
+                attributes = json.loads(self.attributes)
+
             return State(
-                self.entity_id, self.state,
-                json.loads(self.attributes),
-                _process_timestamp(self.last_changed),
-                _process_timestamp(self.last_updated)
+                self.entity_id, self.state, attributes,
+                process_timestamp(self.last_changed),
+                process_timestamp(self.last_updated)
             )
         except ValueError:
             # When json.loads fails
@@ -164,7 +204,7 @@ class SchemaChanges(Base):   # type: ignore
     changed = Column(DateTime(timezone=True), default=datetime.utcnow)
 
 
-def _process_timestamp(ts):
+def process_timestamp(ts):
     """Process a timestamp into datetime object."""
     if ts is None:
         return None
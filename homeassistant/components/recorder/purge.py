@@ -8,55 +8,35 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of rows deleted from each table per purge run
+MAX_ROWS_TO_PURGE = 1000
+
 
 def purge_old_data(instance, purge_days, repack):
-    """Purge events and states older than purge_days ago."""
-    from .models import States, Events
-    from sqlalchemy import func
+    """Purge events and states older than purge_days ago.
 
+    At most MAX_ROWS_TO_PURGE rows are deleted from each table per call so
+    the database is never locked for long. Returns True when everything is
+    purged, otherwise the purge should be run again. Shared attributes no
+    longer used by any state are deleted once the last batch is purged.
+    """
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
-    _LOGGER.debug("Purging events before %s", purge_before)
+    _LOGGER.debug("Purging states and events before %s", purge_before)
 
     with session_scope(session=instance.get_session()) as session:
-        delete_states = session.query(States) \
-                            .filter((States.last_updated < purge_before))
-
-        # For each entity, the most recent state is protected from deletion
-        # s.t. we can properly restore state even if the entity has not been
-        # updated in a long time
-        protected_states = session.query(func.max(States.state_id)) \
-            .group_by(States.entity_id).all()
-
-        protected_state_ids = tuple(state[0] for state in protected_states)
-
-        if protected_state_ids:
-            delete_states = delete_states \
-                .filter(~States.state_id.in_(protected_state_ids))
+        deleted_states = _purge_states(session, purge_before)
+        deleted_events = _purge_events(session, purge_before)
 
-        deleted_rows = delete_states.delete(synchronize_session=False)
-        _LOGGER.debug("Deleted %s states", deleted_rows)
+    _LOGGER.debug("Deleted %s states and %s events",
+                  deleted_states, deleted_events)
 
-        delete_events = session.query(Events) \
-            .filter((Events.time_fired < purge_before))
+    if max(deleted_states, deleted_events) >= MAX_ROWS_TO_PURGE:
+        return False
 
-        # We also need to protect the events belonging to the protected states.
-        # Otherwise, if the SQL server has "ON DELETE CASCADE" as default, it
-        # will delete the protected state when deleting its associated
-        # event. Also, we would be producing NULLed foreign keys otherwise.
-        if protected_state_ids:
-            protected_events = session.query(States.event_id) \
-                .filter(States.state_id.in_(protected_state_ids)) \
-                .filter(States.event_id.isnot(None)) \
-                .all()
-
-            protected_event_ids = tuple(state[0] for state in protected_events)
-
-            if protected_event_ids:
-                delete_events = delete_events \
-                    .filter(~Events.event_id.in_(protected_event_ids))
+    with session_scope(session=instance.get_session()) as session:
+        deleted_attributes = _purge_unused_attributes(session)
 
-        deleted_rows = delete_events.delete(synchronize_session=False)
-        _LOGGER.debug("Deleted %s events", deleted_rows)
+    _LOGGER.debug("Deleted %s shared attributes", deleted_attributes)
 
     # Execute sqlite vacuum command to free up space on disk
     _LOGGER.debug("DB engine driver: %s", instance.engine.driver)
@@ -68,3 +48,72 @@ def purge_old_data(instance, purge_days, repack):
             instance.engine.execute("VACUUM")
         except exc.OperationalError as err:
             _LOGGER.error("Error vacuuming SQLite: %s.", err)
+
+    _LOGGER.info("Purged states and events older than %s", purge_before)
+    return True
+
+
+def _purge_states(session, purge_before):
+    """Delete a batch of old states and return the number deleted.
+
+    For each entity, the most recent state is protected from deletion
+    s.t. we can properly restore state even if the entity has not been
+    updated in a long time.
+    """
+    from .models import States
+    from sqlalchemy.orm import aliased
+
+    newer = aliased(States)
+    has_newer_state = session.query(newer.state_id).filter(
+        (newer.entity_id == States.entity_id) &
+        (newer.state_id > States.state_id)).exists()
+
+    state_ids = [row[0] for row in session.query(States.state_id)
+                 .filter(States.last_updated < purge_before)
+                 .filter(has_newer_state)
+                 .limit(MAX_ROWS_TO_PURGE)]
+
+    if not state_ids:
+        return 0
+
+    return session.query(States) \
+        .filter(States.state_id.in_(state_ids)) \
+        .delete(synchronize_session=False)
+
+
+def _purge_unused_attributes(session):
+    """Delete all shared attributes no longer used by any state."""
+    from .models import States, StateAttributes
+
+    used = session.query(States.state_id).filter(
+        States.attributes_id == StateAttributes.attributes_id).exists()
+
+    return session.query(StateAttributes) \
+        .filter(~used) \
+        .delete(synchronize_session=False)
+
+
+def _purge_events(session, purge_before):
+    """Delete a batch of old events and return the number deleted.
+
+    Events still referenced by a state are kept. Otherwise, if the SQL
+    server has "ON DELETE CASCADE" as default, it would delete the protected
+    state when deleting its associated event. Also, we would be producing
+    NULLed foreign keys otherwise.
+    """
+    from .models import Events, States
+
+    referenced = session.query(States.state_id).filter(
+        States.event_id == Events.event_id).exists()
+
+    event_ids = [row[0] for row in session.query(Events.event_id)
+                 .filter(Events.time_fired < purge_before)
+                 .filter(~referenced)
+                 .limit(MAX_ROWS_TO_PURGE)]
+
+    if not event_ids:
+        return 0
+
+    return session.query(Events) \
+        .filter(Events.event_id.in_(event_ids)) \
+        .delete(synchronize_session=False)
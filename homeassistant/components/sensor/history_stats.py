@@ -4,6 +4,7 @@ Component to make instant statistics about your history.
 For more details about this platform, please refer to the documentation at
 https://home-assistant.io/components/sensor.history_stats/
 """
+from collections import deque
 import datetime
 import logging
 import math
@@ -17,6 +18,7 @@ from homeassistant.components.sensor import PLATFORM_SCHEMA
 from homeassistant.const import (
     CONF_NAME, CONF_ENTITY_ID, CONF_STATE, CONF_TYPE,
     EVENT_HOMEASSISTANT_START)
+from homeassistant.core import callback
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import track_state_change
@@ -109,15 +111,45 @@ class HistoryStatsSensor(Entity):
         self.value = None
         self.count = None
 
+        # Changes of the tracked entity not processed by update yet
+        self._live_changes = deque()
+        # Timestamp since which the changes are known, and if the tracked
+        # entity was in the measured state at that time
+        self._known_since = None
+        self._known_since_on = False
+        # Times the tracked entity entered or left the measured state
+        self._flips = []
+        self._last_change = None
+        self._last_on = False
+        # Accumulated values of the period, up to the applied flips
+        self._accumulated_period = None
+        self._applied = 0
+        self._elapsed = 0
+        self._count = 0
+        self._cursor_time = None
+        self._cursor_on = False
+
         def force_refresh(*args):
             """Force the component to refresh."""
             self.schedule_update_ha_state(True)
 
+        @callback
+        def record_change(entity_id, old_state, new_state):
+            """Record a change of the tracked entity and refresh."""
+            if new_state is None:
+                self._live_changes.append(
+                    (dt_util.utcnow().timestamp(), False))
+            else:
+                self._live_changes.append(
+                    (new_state.last_changed.timestamp(),
+                     new_state.state == self._entity_state))
+            self.async_schedule_update_ha_state(True)
+
         # Update value when home assistant starts
         hass.bus.listen_once(EVENT_HOMEASSISTANT_START, force_refresh)
 
         # Update value when tracked entity changes its state
-        track_state_change(hass, entity_id, force_refresh)
+        track_state_change(hass, entity_id, record_change)
 
     @property
     def name(self):
@@ -188,51 +220,107 @@ class HistoryStatsSensor(Entity):
         p_end_timestamp = math.floor(dt_util.as_timestamp(p_end))
         now_timestamp = math.floor(dt_util.as_timestamp(now))
 
-        # If period has not changed and current time after the period end...
+        # If period has not changed, current time after the period end and
+        # there are no new changes...
         if start_timestamp == p_start_timestamp and \
             end_timestamp == p_end_timestamp and \
-                end_timestamp <= now_timestamp:
+                end_timestamp <= now_timestamp and not self._live_changes:
             # Don't compute anything as the value cannot have changed
             return
 
-        # Get history between start and end
-        history_list = history.state_changes_during_period(
-            self.hass, start, end, str(self._entity_id))
+        # Only query the history if the changes since start are not known
+        if self._known_since is None or start_timestamp < self._known_since:
+            if not self.load_history(start, start_timestamp):
+                return
 
-        if self._entity_id not in history_list.keys():
-            return
+        while self._live_changes:
+            self.add_change(*self._live_changes.popleft())
 
-        # Get the first state
-        last_state = history.get_state(self.hass, start, self._entity_id)
-        last_state = (last_state is not None and
-                      last_state == self._entity_state)
-        last_time = start_timestamp
-        elapsed = 0
-        count = 0
-
-        # Make calculations
-        for item in history_list.get(self._entity_id):
-            current_state = item.state == self._entity_state
-            current_time = item.last_changed.timestamp()
-
-            if last_state:
-                elapsed += current_time - last_time
-            if current_state and not last_state:
-                count += 1
-
-            last_state = current_state
-            last_time = current_time
-
-        # Count time elapsed between last history state and end of measure
-        if last_state:
+        if self._accumulated_period != (start_timestamp, end_timestamp):
+            self.reset_accumulator(start_timestamp, end_timestamp)
+
+        # Accumulate the changes until the end of the period
+        flips = self._flips
+        while self._applied < len(flips):
+            current_time, current_on = flips[self._applied]
+            if current_time > end_timestamp:
+                break
+
+            if current_on:
+                self._count += 1
+            else:
+                self._elapsed += current_time - self._cursor_time
+
+            self._cursor_time = current_time
+            self._cursor_on = current_on
+            self._applied += 1
+
+        # Count time elapsed between last change and end of measure
+        elapsed = self._elapsed
+        if self._cursor_on:
             measure_end = min(end_timestamp, now_timestamp)
-            elapsed += measure_end - last_time
+            elapsed += max(measure_end - self._cursor_time, 0)
 
         # Save value in hours
         self.value = elapsed / 3600
 
         # Save counter
-        self.count = count
+        self.count = self._count
+
+    def load_history(self, start, start_timestamp):
+        """Load the changes since start from the history."""
+        history_list = history.state_changes_during_period(
+            self.hass, start, entity_id=str(self._entity_id))
+        first_state = history.get_state(self.hass, start, self._entity_id)
+
+        if self._entity_id not in history_list and first_state is None:
+            return False
+
+        self._known_since = self._last_change = start_timestamp
+        self._known_since_on = self._last_on = (
+            first_state is not None and
+            first_state.state == self._entity_state)
+        self._flips = []
+        self._accumulated_period = None
+
+        for item in history_list.get(self._entity_id, ()):
+            self.add_change(item.last_changed.timestamp(),
+                            item.state == self._entity_state)
+
+        return True
+
+    def add_change(self, timestamp, is_on):
+        """Add a change of the tracked entity that is not known yet."""
+        if self._known_since is None or timestamp <= self._last_change:
+            return
+
+        self._last_change = timestamp
+
+        if is_on != self._last_on:
+            self._flips.append((timestamp, is_on))
+            self._last_on = is_on
+
+    def reset_accumulator(self, start_timestamp, end_timestamp):
+        """Start accumulating a new period, forgetting older changes."""
+        is_on = self._known_since_on
+        dropped = 0
+
+        for flip_time, flip_on in self._flips:
+            if flip_time > start_timestamp:
+                break
+            is_on = flip_on
+            dropped += 1
+
+        del self._flips[:dropped]
+        self._known_since = max(self._known_since, start_timestamp)
+        self._known_since_on = is_on
+
+        self._accumulated_period = (start_timestamp, end_timestamp)
+        self._applied = 0
+        self._elapsed = 0
+        self._count = 0
+        self._cursor_time = start_timestamp
+        self._cursor_on = is_on
 
     def update_period(self):
         """Parse the templates and store a datetime tuple in _period."""
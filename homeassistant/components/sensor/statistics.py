@@ -5,8 +5,9 @@ For more details about this platform, please refer to the documentation at
 https://home-assistant.io/components/sensor.statistics/
 """
 import asyncio
+from bisect import bisect_left, insort
 import logging
-import statistics
+import math
 from collections import deque
 
 import voluptuous as vol
@@ -83,9 +84,7 @@ class StatisticsSensor(Entity):
         self._sampling_size = sampling_size
         self._max_age = max_age
         self._unit_of_measurement = None
-        self.states = deque(maxlen=self._sampling_size)
-        if self._max_age is not None:
-            self.ages = deque(maxlen=self._sampling_size)
+        self.samples = StreamingStatistics(self._sampling_size)
 
         self.median = self.mean = self.variance = self.stdev = 0
         self.min = self.max = self.total = self.count = 0
@@ -112,9 +111,8 @@ class StatisticsSensor(Entity):
 
     def _add_state_to_queue(self, new_state):
         try:
-            self.states.append(float(new_state.state))
-            if self._max_age is not None:
-                self.ages.append(new_state.last_updated)
+            self.samples.append(float(new_state.state),
+                                new_state.last_updated)
             self.count = self.count + 1
         except ValueError:
             self.count = self.count + 1
@@ -172,10 +170,10 @@ class StatisticsSensor(Entity):
     def _purge_old(self):
         """Remove states which are older than self._max_age."""
         now = dt_util.utcnow()
+        ages = self.samples.ages
 
-        while self.ages and (now - self.ages[0]) > self._max_age:
-            self.ages.popleft()
-            self.states.popleft()
+        while ages and (now - ages[0]) > self._max_age:
+            self.samples.popleft()
 
     @asyncio.coroutine
     def async_update(self):
@@ -184,32 +182,35 @@ class StatisticsSensor(Entity):
             self._purge_old()
 
         if not self.is_binary:
-            try:  # require only one data point
-                self.mean = round(statistics.mean(self.states), 2)
-                self.median = round(statistics.median(self.states), 2)
-            except statistics.StatisticsError as err:
-                _LOGGER.error(err)
+            samples = self.samples
+            count = len(samples)
+
+            if count:  # require only one data point
+                self.mean = round(samples.mean, 2)
+                self.median = round(samples.median, 2)
+            else:
+                _LOGGER.error("mean requires at least one data point")
                 self.mean = self.median = STATE_UNKNOWN
 
-            try:  # require at least two data points
-                self.stdev = round(statistics.stdev(self.states), 2)
-                self.variance = round(statistics.variance(self.states), 2)
-            except statistics.StatisticsError as err:
-                _LOGGER.error(err)
+            if count > 1:  # require at least two data points
+                self.stdev = round(samples.stdev, 2)
+                self.variance = round(samples.variance, 2)
+            else:
+                _LOGGER.error("variance requires at least two data points")
                 self.stdev = self.variance = STATE_UNKNOWN
 
-            if self.states:
-                self.count = len(self.states)
-                self.total = round(sum(self.states), 2)
-                self.min = min(self.states)
-                self.max = max(self.states)
-                self.change = self.states[-1] - self.states[0]
+            if count:
+                self.count = count
+                self.total = round(samples.total, 2)
+                self.min = samples.min
+                self.max = samples.max
+                self.change = samples.values[-1] - samples.values[0]
                 self.average_change = self.change
-                if len(self.states) > 1:
-                    self.average_change /= len(self.states) - 1
+                if count > 1:
+                    self.average_change /= count - 1
                 if self._max_age is not None:
-                    self.max_age = max(self.ages)
-                    self.min_age = min(self.ages)
+                    self.max_age = samples.ages[-1]
+                    self.min_age = samples.ages[0]
             else:
                 self.min = self.max = self.total = STATE_UNKNOWN
                 self.average_change = self.change = STATE_UNKNOWN
@@ -237,3 +238,109 @@ class StatisticsSensor(Entity):
             self._add_state_to_queue(state)
 
         _LOGGER.debug("initializing from database completed")
+
+
+class StreamingStatistics:
+    """Statistics of the latest samples, updated per added or removed sample.
+
+    Mean and variance are kept as running values (Welford's algorithm),
+    median, min and max are read from a sorted copy of the samples. The
+    running values are recomputed exactly after as many removals as there
+    are samples, so rounding errors do not add up.
+    """
+
+    def __init__(self, size):
+        """Initialize the statistics for at most size samples."""
+        self.values = deque()
+        self.ages = deque()
+        self._size = size
+        self._sorted = []
+        self._total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removals = 0
+
+    def __len__(self):
+        """Return the number of samples."""
+        return len(self.values)
+
+    def append(self, value, age):
+        """Add a sample, removing the oldest one if the size is reached."""
+        if len(self.values) >= self._size:
+            self.popleft()
+
+        self.values.append(value)
+        self.ages.append(age)
+        insort(self._sorted, value)
+
+        self._total += value
+        delta = value - self._mean
+        self._mean += delta / len(self.values)
+        self._m2 += delta * (value - self._mean)
+
+    def popleft(self):
+        """Remove the oldest sample."""
+        value = self.values.popleft()
+        self.ages.popleft()
+        del self._sorted[bisect_left(self._sorted, value)]
+
+        count = len(self.values)
+        self._removals += 1
+
+        if self._removals >= count:
+            self._recompute()
+            return
+
+        self._total -= value
+        delta = value - self._mean
+        self._mean -= delta / count
+        self._m2 -= delta * (value - self._mean)
+
+    def _recompute(self):
+        """Compute the running values from the samples."""
+        count = len(self.values)
+        self._removals = 0
+        self._total = math.fsum(self.values)
+        self._mean = self._total / count if count else 0.0
+        self._m2 = math.fsum((value - self._mean) ** 2
+                             for value in self.values)
+
+    @property
+    def total(self):
+        """Return the sum of the samples."""
+        return self._total
+
+    @property
+    def mean(self):
+        """Return the mean of the samples."""
+        return self._mean
+
+    @property
+    def median(self):
+        """Return the median of the samples."""
+        ordered = self._sorted
+        middle = len(ordered) // 2
+
+        if len(ordered) % 2:
+            return ordered[middle]
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+    @property
+    def variance(self):
+        """Return the sample variance, requires two samples."""
+        return max(self._m2, 0.0) / (len(self.values) - 1)
+
+    @property
+    def stdev(self):
+        """Return the sample standard deviation, requires two samples."""
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self):
+        """Return the smallest sample."""
+        return self._sorted[0]
+
+    @property
+    def max(self):
+        """Return the largest sample."""
+        return self._sorted[-1]
@@ -16,17 +16,18 @@ import voluptuous as vol
 from voluptuous.humanize import humanize_error
 
 from homeassistant.const import (
-    MATCH_ALL, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
+    MATCH_ALL, EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED,
     __version__)
 from homeassistant.components import frontend
-from homeassistant.core import callback
-from homeassistant.remote import JSONEncoder
+from homeassistant.core import callback, split_entity_id
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event_hub import async_get_event_hub
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.http.auth import validate_password
 from homeassistant.components.http.const import KEY_AUTHENTICATED
 from homeassistant.components.http.ban import process_wrong_login
+from homeassistant.util.json import JSONEncoder
 
 DOMAIN = 'websocket_api'
 
@@ -38,6 +39,7 @@ MAX_PENDING_MSG = 512
 ERR_ID_REUSE = 1
 ERR_INVALID_FORMAT = 2
 ERR_NOT_FOUND = 3
+ERR_UNKNOWN_ERROR = 4
 
 TYPE_AUTH = 'auth'
 TYPE_AUTH_INVALID = 'auth_invalid'
@@ -52,6 +54,7 @@ TYPE_GET_STATES = 'get_states'
 TYPE_PING = 'ping'
 TYPE_PONG = 'pong'
 TYPE_RESULT = 'result'
+TYPE_SUBSCRIBE_ENTITIES = 'subscribe_entities'
 TYPE_SUBSCRIBE_EVENTS = 'subscribe_events'
 TYPE_UNSUBSCRIBE_EVENTS = 'unsubscribe_events'
 
@@ -59,6 +62,11 @@ _LOGGER = logging.getLogger(__name__)
 
 JSON_DUMP = partial(json.dumps, cls=JSONEncoder)
 
+# Messages built around JSON that is encoded once and shared
+EVENT_MESSAGE_TEMPLATE = '{{"id": {}, "type": "event", "event": {}}}'
+RESULT_MESSAGE_TEMPLATE = \
+    '{{"id": {}, "type": "result", "success": true, "result": {}}}'
+
 AUTH_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('type'): TYPE_AUTH,
     vol.Required('api_password'): str,
@@ -70,6 +78,14 @@ SUBSCRIBE_EVENTS_MESSAGE_SCHEMA = vol.Schema({
     vol.Optional('event_type', default=MATCH_ALL): str,
 })
 
+SUBSCRIBE_ENTITIES_MESSAGE_SCHEMA = vol.All(vol.Schema({
+    vol.Required('id'): cv.positive_int,
+    vol.Required('type'): TYPE_SUBSCRIBE_ENTITIES,
+    vol.Optional('entity_ids'): cv.entity_ids,
+    vol.Optional('domains'): vol.All(
+        cv.ensure_list, [vol.All(cv.string, vol.Lower, cv.slug)]),
+}), cv.has_at_least_one_key('entity_ids', 'domains'))
+
 UNSUBSCRIBE_EVENTS_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('id'): cv.positive_int,
     vol.Required('type'): TYPE_UNSUBSCRIBE_EVENTS,
@@ -112,6 +128,7 @@ PING_MESSAGE_SCHEMA = vol.Schema({
 BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('id'): cv.positive_int,
     vol.Required('type'): vol.Any(TYPE_CALL_SERVICE,
+                                  TYPE_SUBSCRIBE_ENTITIES,
                                   TYPE_SUBSCRIBE_EVENTS,
                                   TYPE_UNSUBSCRIBE_EVENTS,
                                   TYPE_GET_STATES,
@@ -160,6 +177,58 @@ def event_message(iden, event):
     }
 
 
+def entities_message(iden, added=None, changed=None, removed=None):
+    """Return an entities event message with the given parts."""
+    event = {}
+    if added is not None:
+        event['added'] = added
+    if changed is not None:
+        event['changed'] = changed
+    if removed is not None:
+        event['removed'] = removed
+    return {
+        'id': iden,
+        'type': TYPE_EVENT,
+        'event': event,
+    }
+
+
+def compressed_state(state):
+    """Return a state as a dict without its entity id."""
+    return {
+        'state': state.state,
+        'attributes': dict(state.attributes),
+        'last_changed': state.last_changed,
+        'last_updated': state.last_updated,
+    }
+
+
+def state_diff(old_state, new_state):
+    """Return the parts of new_state that differ from old_state."""
+    diff = {'last_updated': new_state.last_updated}
+
+    if new_state.state != old_state.state:
+        diff['state'] = new_state.state
+
+    if new_state.last_changed != old_state.last_changed:
+        diff['last_changed'] = new_state.last_changed
+
+    old_attr = old_state.attributes
+    new_attr = new_state.attributes
+
+    if new_attr is not old_attr:
+        changed = {key: value for key, value in new_attr.items()
+                   if key not in old_attr or old_attr[key] != value}
+        if changed:
+            diff['attributes'] = changed
+
+        removed = [key for key in old_attr if key not in new_attr]
+        if removed:
+            diff['removed_attributes'] = removed
+
+    return diff
+
+
 def error_message(iden, code, message):
     """Return an error result message."""
     return {
@@ -241,7 +310,10 @@ class ActiveConnection:
                     break
                 self.debug("Sending", message)
                 try:
-                    await self.wsock.send_json(message, dumps=JSON_DUMP)
+                    if isinstance(message, str):
+                        await self.wsock.send_str(message)
+                    else:
+                        await self.wsock.send_json(message, dumps=JSON_DUMP)
                 except TypeError as err:
                     _LOGGER.error('Unable to serialize to JSON: %s\n%s',
                                   err, message)
@@ -251,6 +323,7 @@ class ActiveConnection:
         """Send a message to the client outside of the main task.
 
         Closes connection if the client is not reading the messages.
+        Returns if the message was queued.
 
         Async friendly.
         """
@@ -260,6 +333,8 @@ class ActiveConnection:
             self.log_error("Client exceeded max pending messages [2]:",
                            MAX_PENDING_MSG)
             self.cancel()
+            return False
+        return True
 
     @callback
     def cancel(self):
@@ -410,18 +485,77 @@ class ActiveConnection:
         """
         msg = SUBSCRIBE_EVENTS_MESSAGE_SCHEMA(msg)
 
-        async def forward_events(event):
+        @callback
+        def forward_events(serialized):
             """Forward events to websocket."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
+            if serialized.json is None:
+                return None
 
-            self.send_message_outside(event_message(msg['id'], event))
+            return self.send_message_outside(EVENT_MESSAGE_TEMPLATE.format(
+                msg['id'], serialized.json))
 
-        self.event_listeners[msg['id']] = self.hass.bus.async_listen(
-            msg['event_type'], forward_events)
+        self.event_listeners[msg['id']] = async_get_event_hub(
+            self.hass).async_subscribe(
+                msg['event_type'], forward_events).async_unsubscribe
 
         self.to_write.put_nowait(result_message(msg['id']))
 
+    def handle_subscribe_entities(self, msg):
+        """Handle subscribe entities command.
+
+        Sends a snapshot of the matching states followed by diffs of their
+        changes. Unsubscribe with the unsubscribe events command.
+
+        Async friendly.
+        """
+        msg = SUBSCRIBE_ENTITIES_MESSAGE_SCHEMA(msg)
+        iden = msg['id']
+        entity_ids = set(msg.get('entity_ids', ()))
+        domains = set(msg.get('domains', ()))
+
+        @callback
+        def forward_changes(event):
+            """Forward changes of the subscribed entities to websocket."""
+            data = event.data
+            entity_id = data['entity_id']
+
+            if entity_id not in entity_ids and \
+                    split_entity_id(entity_id)[0] not in domains:
+                return
+
+            old_state = data.get('old_state')
+            new_state = data.get('new_state')
+
+            if new_state is None:
+                message = entities_message(iden, removed=[entity_id])
+            elif old_state is None:
+                message = entities_message(iden, added={
+                    entity_id: compressed_state(new_state)})
+            else:
+                message = entities_message(iden, changed={
+                    entity_id: state_diff(old_state, new_state)})
+
+            self.send_message_outside(message)
+
+        self.event_listeners[iden] = self.hass.bus.async_listen(
+            EVENT_STATE_CHANGED, forward_changes)
+
+        states = self.hass.states
+        snapshot = {}
+
+        for domain in domains:
+            for entity_id in states.async_entity_ids(domain):
+                snapshot[entity_id] = compressed_state(
+                    states.get(entity_id))
+
+        for entity_id in entity_ids:
+            state = states.get(entity_id)
+            if state is not None:
+                snapshot[entity_id] = compressed_state(state)
+
+        self.to_write.put_nowait(result_message(iden))
+        self.to_write.put_nowait(entities_message(iden, added=snapshot))
+
     def handle_unsubscribe_events(self, msg):
         """Handle unsubscribe events command.
 
@@ -461,8 +595,17 @@ class ActiveConnection:
         """
         msg = GET_STATES_MESSAGE_SCHEMA(msg)
 
-        self.to_write.put_nowait(result_message(
-            msg['id'], self.hass.states.async_all()))
+        try:
+            states = self.hass.states.async_all_json()
+        except TypeError as err:
+            self.log_error("Unable to serialize states to JSON:", err)
+            self.to_write.put_nowait(error_message(
+                msg['id'], ERR_UNKNOWN_ERROR,
+                'Unable to serialize states to JSON.'))
+            return
+
+        self.to_write.put_nowait(RESULT_MESSAGE_TEMPLATE.format(
+            msg['id'], states))
 
     def handle_get_services(self, msg):
         """Handle get services command.
@@ -6,8 +6,10 @@ of entities and react to changes.
 """
 # pylint: disable=unused-import, too-many-lines
 import asyncio
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 import enum
+import json
 import logging
 import os
 import pathlib
@@ -38,6 +40,7 @@ from homeassistant.util.async_ import (
     fire_coroutine_threadsafe)
 import homeassistant.util as util
 import homeassistant.util.dt as dt_util
+from homeassistant.util.json import JSONEncoder
 import homeassistant.util.location as location
 from homeassistant.util.unit_system import UnitSystem, METRIC_SYSTEM  # NOQA
 
@@ -46,6 +49,9 @@ DOMAIN = 'homeassistant'
 # How long we wait for the result of a service call
 SERVICE_CALL_LIMIT = 10  # seconds
 
+# Number of validated service data remembered per service
+SERVICE_SCHEMA_CACHE_SIZE = 128
+
 # Pattern for validating entity IDs (format: <domain>.<entity>)
 ENTITY_ID_PATTERN = re.compile(r"^(\w+)\.(\w+)$")
 
@@ -94,6 +100,44 @@ def async_loop_exception_handler(loop, context):
     _LOGGER.error("Error doing job: %s", context['message'], **kwargs)
 
 
+class HassJobType(enum.Enum):
+    """Represent how a job should be run."""
+
+    coroutinefunction = 'COROUTINEFUNCTION'
+    callback = 'CALLBACK'
+    executor = 'EXECUTOR'
+
+
+def _get_job_type(target: Callable[..., Any]) -> HassJobType:
+    """Determine how a callable should be run."""
+    if asyncio.iscoroutinefunction(target):
+        return HassJobType.coroutinefunction
+    elif is_callback(target):
+        return HassJobType.callback
+    return HassJobType.executor
+
+
+class HassJob(object):
+    """Represent a callable together with how it should be run.
+
+    The job type is determined once when the job is created instead of on
+    every call.
+    """
+
+    __slots__ = ['target', 'job_type']
+
+    def __init__(self, target: Callable[..., Any]) -> None:
+        """Create a job object."""
+        if asyncio.iscoroutine(target):
+            raise ValueError("Coroutines can't be used as a HassJob")
+        self.target = target
+        self.job_type = _get_job_type(target)
+
+    def __repr__(self):
+        """Return the representation."""
+        return "<Job {} {}>".format(self.job_type, self.target)
+
+
 class CoreState(enum.Enum):
     """Represent the current state of Home Assistant."""
 
@@ -225,6 +269,31 @@ class HomeAssistant(object):
 
         return task
 
+    @callback
+    def async_add_hass_job(self, hassjob: HassJob,
+                           *args: Any) -> Optional[asyncio.Future]:
+        """Add a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: job to run.
+        args: parameters for method to call.
+        """
+        task = None
+
+        if hassjob.job_type is HassJobType.coroutinefunction:
+            task = self.loop.create_task(hassjob.target(*args))
+        elif hassjob.job_type is HassJobType.callback:
+            self.loop.call_soon(hassjob.target, *args)
+        else:
+            task = self.loop.run_in_executor(None, hassjob.target, *args)
+
+        # If a task is scheduled
+        if self._track_task and task is not None:
+            self._pending_tasks.append(task)
+
+        return task
+
     @callback
     def async_track_tasks(self):
         """Track tasks so you can wait for all tasks to be done."""
@@ -249,6 +318,20 @@ class HomeAssistant(object):
         else:
             self.async_add_job(target, *args)
 
+    @callback
+    def async_run_hass_job(self, hassjob: HassJob, *args: Any) -> None:
+        """Run a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: job to run.
+        args: parameters for method to call.
+        """
+        if hassjob.job_type is HassJobType.callback:
+            hassjob.target(*args)
+        else:
+            self.async_add_hass_job(hassjob, *args)
+
     def block_till_done(self) -> None:
         """Block till all pending work is done."""
         run_coroutine_threadsafe(
@@ -354,6 +437,8 @@ class EventBus(object):
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
+        # Lists of HassJob per event type. The lists are replaced instead of
+        # mutated so async_fire can iterate them without taking a copy.
         self._listeners = {}
         self._hass = hass
 
@@ -383,26 +468,40 @@ class EventBus(object):
                    origin=EventOrigin.local):
         """Fire an event.
 
+        Listeners marked as callback are called directly, all other
+        listeners are scheduled as jobs.
+
         This method must be run in the event loop.
         """
-        listeners = self._listeners.get(event_type, [])
+        listeners = self._listeners.get(event_type, ())
 
         # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if (match_all_listeners is not None and
-                event_type != EVENT_HOMEASSISTANT_CLOSE):
-            listeners = match_all_listeners + listeners
+        if event_type != EVENT_HOMEASSISTANT_CLOSE:
+            match_all_listeners = self._listeners.get(MATCH_ALL, ())
+        else:
+            match_all_listeners = ()
+
+        log_event = (event_type != EVENT_TIME_CHANGED and
+                     _LOGGER.isEnabledFor(logging.INFO))
+
+        if not listeners and not match_all_listeners and not log_event:
+            return
 
         event = Event(event_type, event_data, origin)
 
-        if event_type != EVENT_TIME_CHANGED:
+        if log_event:
             _LOGGER.info("Bus:Handling %s", event)
 
-        if not listeners:
-            return
-
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        for jobs in (match_all_listeners, listeners):
+            for job in jobs:
+                if job.job_type is HassJobType.callback:
+                    try:
+                        job.target(event)
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception("Error running listener %s for %s",
+                                          job.target, event)
+                else:
+                    self._hass.async_add_hass_job(job, event)
 
     def listen(self, event_type, listener):
         """Listen for all events or events of a specific type.
@@ -429,10 +528,8 @@ class EventBus(object):
 
         This method must be run in the event loop.
         """
-        if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
-        else:
-            self._listeners[event_type] = [listener]
+        self._listeners[event_type] = \
+            self._listeners.get(event_type, []) + [HassJob(listener)]
 
         def remove_listener():
             """Remove the listener."""
@@ -470,6 +567,8 @@ class EventBus(object):
 
         This method must be run in the event loop.
         """
+        job = HassJob(listener)
+
         @callback
         def onetime_listener(event):
             """Remove listener from eventbus and then fire listener."""
@@ -482,7 +581,7 @@ class EventBus(object):
             # This will make sure the second time it does nothing.
             setattr(onetime_listener, 'run', True)
             self._async_remove_listener(event_type, onetime_listener)
-            self._hass.async_run_job(listener, event)
+            self._hass.async_run_hass_job(job, event)
 
         return self.async_listen(event_type, onetime_listener)
 
@@ -493,15 +592,20 @@ class EventBus(object):
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(listener)
-
-            # delete event_type list if empty
-            if not self._listeners[event_type]:
-                self._listeners.pop(event_type)
-        except (KeyError, ValueError):
+            jobs = self._listeners[event_type]
+            index = next(idx for idx, job in enumerate(jobs)
+                         if job.target == listener)
+        except (KeyError, StopIteration):
             # KeyError is key event_type listener did not exist
-            # ValueError if listener did not exist within event_type
+            # StopIteration if listener did not exist within event_type
             _LOGGER.warning("Unable to remove unknown listener %s", listener)
+            return
+
+        if len(jobs) == 1:
+            # delete event_type list if empty
+            self._listeners.pop(event_type)
+        else:
+            self._listeners[event_type] = jobs[:index] + jobs[index + 1:]
 
 
 class State(object):
@@ -617,6 +721,13 @@ class StateMachine(object):
     def __init__(self, bus, loop):
         """Initialize state machine."""
         self._states = {}
+        # Entity ids per domain, dicts to keep them in order of addition
+        self._domains = {}
+        # Lowest suffix that might be free per entity id that was in use,
+        # lower suffixes had a state when last generating an entity id
+        self._suffixes = {}
+        # Cached JSON per entity id, together with the state it encodes
+        self._json = {}
         self._bus = bus
         self._loop = loop
 
@@ -636,10 +747,43 @@ class StateMachine(object):
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        return list(self._domains.get(domain_filter.lower(), ()))
+
+    @callback
+    def async_available_entity_id(self, preferred_id, *taken):
+        """Return an entity id without a state based on preferred_id.
+
+        If preferred_id is in use the lowest free _2, _3, .. suffix is added.
+        Entity ids in any of the taken containers are in use too.
+
+        This method must be run in the event loop.
+        """
+        states = self._states
+
+        def in_use(entity_id):
+            """Return if the entity id is in use."""
+            return entity_id in states or \
+                any(entity_id in container for container in taken)
+
+        if not in_use(preferred_id):
+            return preferred_id
+
+        # Only remember the suffixes taken by states, the taken containers
+        # differ between calls
+        suffix = self._suffixes.get(preferred_id, 2)
+        entity_id = '{}_{}'.format(preferred_id, suffix)
 
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+        while entity_id in states:
+            suffix += 1
+            entity_id = '{}_{}'.format(preferred_id, suffix)
+
+        self._suffixes[preferred_id] = suffix
+
+        while in_use(entity_id):
+            suffix += 1
+            entity_id = '{}_{}'.format(preferred_id, suffix)
+
+        return entity_id
 
     def all(self):
         """Create a list of all states."""
@@ -653,6 +797,28 @@ class StateMachine(object):
         """
         return list(self._states.values())
 
+    @callback
+    def async_all_json(self):
+        """Return a JSON array of all states.
+
+        The JSON of a state is cached until the entity is set or removed.
+
+        This method must be run in the event loop.
+        """
+        cache = self._json
+        fragments = []
+
+        for entity_id, state in self._states.items():
+            cached = cache.get(entity_id)
+
+            if cached is None or cached[0] is not state:
+                cached = cache[entity_id] = (state, json.dumps(
+                    state, sort_keys=True, cls=JSONEncoder))
+
+            fragments.append(cached[1])
+
+        return '[{}]'.format(', '.join(fragments))
+
     def get(self, entity_id):
         """Retrieve state of entity_id or None if not found.
 
@@ -690,6 +856,17 @@ class StateMachine(object):
         if old_state is None:
             return False
 
+        self._json.pop(entity_id, None)
+
+        del self._domains[old_state.domain][entity_id]
+
+        # The suffix of the entity id is free again
+        preferred_id, _, suffix = entity_id.rpartition('_')
+
+        if suffix.isdigit() and \
+                int(suffix) < self._suffixes.get(preferred_id, 0):
+            self._suffixes[preferred_id] = int(suffix)
+
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -737,6 +914,15 @@ class StateMachine(object):
         last_changed = old_state.last_changed if same_state else None
         state = State(entity_id, new_state, attributes, last_changed)
         self._states[entity_id] = state
+        self._json.pop(entity_id, None)
+
+        if not is_existing:
+            domain_ids = self._domains.get(state.domain)
+
+            if domain_ids is None:
+                domain_ids = self._domains[state.domain] = {}
+
+            domain_ids[entity_id] = None
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -747,14 +933,75 @@ class StateMachine(object):
 class Service(object):
     """Representation of a callable service."""
 
-    __slots__ = ['func', 'schema', 'is_callback', 'is_coroutinefunction']
+    __slots__ = ['func', 'schema', 'is_callback', 'is_coroutinefunction',
+                 'cache_hits', 'cache_misses', '_validated']
 
-    def __init__(self, func, schema):
+    def __init__(self, func, schema, cache_schema=False):
         """Initialize a service."""
         self.func = func
         self.schema = schema
         self.is_callback = is_callback(func)
         self.is_coroutinefunction = asyncio.iscoroutinefunction(func)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._validated = OrderedDict() if cache_schema else None
+
+    def validate(self, service_data):
+        """Validate service data with the schema.
+
+        If caching is enabled, the result for the most recently used service
+        data is cached, so repeated calls with the same data skip the schema.
+        """
+        if self._validated is None:
+            return self.schema(service_data)
+
+        try:
+            key = _freeze(service_data)
+        except TypeError:
+            # Unhashable or unorderable values, don't cache
+            key = None
+
+        if key is not None:
+            validated = self._validated.get(key)
+            if validated is not None:
+                self._validated.move_to_end(key)
+                self.cache_hits += 1
+                return _copy_validated(validated)
+
+        self.cache_misses += 1
+        validated = self.schema(service_data)
+
+        if key is None or not isinstance(validated, dict):
+            return validated
+
+        self._validated[key] = validated
+        if len(self._validated) > SERVICE_SCHEMA_CACHE_SIZE:
+            self._validated.popitem(last=False)
+        return _copy_validated(validated)
+
+
+def _freeze(value):
+    """Return a hashable key for service data.
+
+    Types are part of the key, so for example True and 1 differ.
+    """
+    if isinstance(value, dict):
+        return dict, tuple(sorted(
+            (key, _freeze(item)) for key, item in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    hash(value)
+    return type(value), value
+
+
+def _copy_validated(validated):
+    """Copy cached validated data so a service can not alter the cache."""
+    if isinstance(validated, dict):
+        return {key: _copy_validated(value)
+                for key, value in validated.items()}
+    elif isinstance(validated, list):
+        return [_copy_validated(value) for value in validated]
+    return validated
 
 
 class ServiceCall(object):
@@ -786,6 +1033,8 @@ class ServiceRegistry(object):
         self._services = {}
         self._hass = hass
         self._async_unsub_call_event = None
+        # Ids of calls fired by async_call that are executed directly
+        self._direct_call_ids = set()
 
         def _gen_unique_id():
             cur_id = 1
@@ -819,29 +1068,35 @@ class ServiceRegistry(object):
         """
         return service.lower() in self._services.get(domain.lower(), [])
 
-    def register(self, domain, service, service_func, schema=None):
+    def register(self, domain, service, service_func, schema=None,
+                 cache_schema=False):
         """
         Register a service.
 
-        Schema is called to coerce and validate the service data.
+        Schema is called to coerce and validate the service data. Pass
+        cache_schema if the schema always gives the same result for the same
+        data, to reuse the validated data of recent calls.
         """
         run_callback_threadsafe(
-            self._hass.loop,
-            self.async_register, domain, service, service_func, schema
+            self._hass.loop, self.async_register, domain, service,
+            service_func, schema, cache_schema
         ).result()
 
     @callback
-    def async_register(self, domain, service, service_func, schema=None):
+    def async_register(self, domain, service, service_func, schema=None,
+                       cache_schema=False):
         """
         Register a service.
 
-        Schema is called to coerce and validate the service data.
+        Schema is called to coerce and validate the service data. Pass
+        cache_schema if the schema always gives the same result for the same
+        data, to reuse the validated data of recent calls.
 
         This method must be run in the event loop.
         """
         domain = domain.lower()
         service = service.lower()
-        service_obj = Service(service_func, schema)
+        service_obj = Service(service_func, schema, cache_schema)
 
         if domain in self._services:
             self._services[domain][service] = service_obj
@@ -893,9 +1148,10 @@ class ServiceRegistry(object):
         If blocking = True, will return boolean if service executed
         successfully within SERVICE_CALL_LIMIT.
 
-        This method will fire an event to call the service.
-        This event will be picked up by this ServiceRegistry and any
-        other ServiceRegistry that is listening on the EventBus.
+        A service registered here is executed directly. An event is still
+        fired to let observers know about the call, services not registered
+        here are picked up by any other ServiceRegistry that is listening
+        on the EventBus.
 
         Because the service is sent as an event you are not allowed to use
         the keys ATTR_DOMAIN and ATTR_SERVICE in your service_data.
@@ -916,9 +1172,10 @@ class ServiceRegistry(object):
         If blocking = True, will return boolean if service executed
         successfully within SERVICE_CALL_LIMIT.
 
-        This method will fire an event to call the service.
-        This event will be picked up by this ServiceRegistry and any
-        other ServiceRegistry that is listening on the EventBus.
+        A service registered here is executed directly. An event is still
+        fired to let observers know about the call, services not registered
+        here are picked up by any other ServiceRegistry that is listening
+        on the EventBus.
 
         Because the service is sent as an event you are not allowed to use
         the keys ATTR_DOMAIN and ATTR_SERVICE in your service_data.
@@ -926,16 +1183,37 @@ class ServiceRegistry(object):
         This method is a coroutine.
         """
         call_id = self._generate_unique_id()
+        domain = domain.lower()
+        service = service.lower()
 
         event_data = {
-            ATTR_DOMAIN: domain.lower(),
-            ATTR_SERVICE: service.lower(),
+            ATTR_DOMAIN: domain,
+            ATTR_SERVICE: service,
             ATTR_SERVICE_DATA: service_data,
             ATTR_SERVICE_CALL_ID: call_id,
         }
 
+        service_handler = self._services.get(domain, {}).get(service)
+
+        if service_handler is None:
+            return await self._async_call_over_bus(event_data, blocking)
+
+        self._direct_call_ids.add(call_id)
+        self._hass.bus.async_fire(EVENT_CALL_SERVICE, event_data)
+
+        task = self._hass.async_add_job(self._execute_service(
+            service_handler, domain, service, service_data or {}, call_id))
+
+        if blocking:
+            done, _ = await asyncio.wait(
+                [task], loop=self._hass.loop, timeout=SERVICE_CALL_LIMIT)
+            return bool(done) and task.result()
+
+    async def _async_call_over_bus(self, event_data, blocking):
+        """Call a service that might be registered on another registry."""
         if blocking:
             fut = asyncio.Future(loop=self._hass.loop)
+            call_id = event_data[ATTR_SERVICE_CALL_ID]
 
             @callback
             def service_executed(event):
@@ -955,12 +1233,19 @@ class ServiceRegistry(object):
             unsub()
             return success
 
-    async def _event_to_service_call(self, event):
+    @callback
+    def _event_to_service_call(self, event):
         """Handle the SERVICE_CALLED events from the EventBus."""
+        call_id = event.data.get(ATTR_SERVICE_CALL_ID)
+
+        if call_id in self._direct_call_ids:
+            # Fired by async_call, which executes the service itself
+            self._direct_call_ids.remove(call_id)
+            return
+
         service_data = event.data.get(ATTR_SERVICE_DATA) or {}
         domain = event.data.get(ATTR_DOMAIN).lower()
         service = event.data.get(ATTR_SERVICE).lower()
-        call_id = event.data.get(ATTR_SERVICE_CALL_ID)
 
         if not self.has_service(domain, service):
             if event.origin == EventOrigin.local:
@@ -968,48 +1253,56 @@ class ServiceRegistry(object):
                                 domain, service)
             return
 
-        service_handler = self._services[domain][service]
-
-        def fire_service_executed():
-            """Fire service executed event."""
-            if not call_id:
-                return
-
-            data = {ATTR_SERVICE_CALL_ID: call_id}
+        self._hass.async_add_job(self._execute_service(
+            self._services[domain][service], domain, service, service_data,
+            call_id))
 
-            if (service_handler.is_coroutinefunction or
-                    service_handler.is_callback):
-                self._hass.bus.async_fire(EVENT_SERVICE_EXECUTED, data)
-            else:
-                self._hass.bus.fire(EVENT_SERVICE_EXECUTED, data)
+    async def _execute_service(self, service_handler, domain, service,
+                               service_data, call_id):
+        """Validate the data and execute a service.
 
+        Returns False if the service raised an exception.
+        """
         try:
             if service_handler.schema:
-                service_data = service_handler.schema(service_data)
+                service_data = service_handler.validate(service_data)
         except vol.Invalid as ex:
             _LOGGER.error("Invalid service data for %s.%s: %s",
                           domain, service, humanize_error(service_data, ex))
-            fire_service_executed()
-            return
+            self._fire_service_executed(call_id)
+            return True
 
         service_call = ServiceCall(domain, service, service_data, call_id)
 
         try:
             if service_handler.is_callback:
                 service_handler.func(service_call)
-                fire_service_executed()
             elif service_handler.is_coroutinefunction:
                 await service_handler.func(service_call)
-                fire_service_executed()
             else:
                 def execute_service():
-                    """Execute a service and fires a SERVICE_EXECUTED event."""
+                    """Execute a service and fire a SERVICE_EXECUTED event."""
                     service_handler.func(service_call)
-                    fire_service_executed()
+
+                    if call_id:
+                        self._hass.bus.fire(EVENT_SERVICE_EXECUTED,
+                                            {ATTR_SERVICE_CALL_ID: call_id})
 
                 await self._hass.async_add_job(execute_service)
+                return True
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception('Error executing service %s', service_call)
+            return False
+
+        self._fire_service_executed(call_id)
+        return True
+
+    @callback
+    def _fire_service_executed(self, call_id):
+        """Fire service executed event."""
+        if call_id:
+            self._hass.bus.async_fire(
+                EVENT_SERVICE_EXECUTED, {ATTR_SERVICE_CALL_ID: call_id})
 
 
 class Config(object):
@@ -45,15 +45,16 @@ def async_generate_entity_id(entity_id_format: str, name: Optional[str],
                              current_ids: Optional[Iterable[str]] = None,
                              hass: Optional[HomeAssistant] = None) -> str:
     """Generate a unique entity ID based on given entity IDs or used IDs."""
-    if current_ids is None:
-        if hass is None:
-            raise ValueError("Missing required parameter currentids or hass")
-
-        current_ids = hass.states.async_entity_ids()
     name = (name or DEVICE_DEFAULT_NAME).lower()
+    preferred_id = entity_id_format.format(slugify(name))
 
-    return ensure_unique_string(
-        entity_id_format.format(slugify(name)), current_ids)
+    if current_ids is not None:
+        return ensure_unique_string(preferred_id, current_ids)
+
+    if hass is None:
+        raise ValueError("Missing required parameter currentids or hass")
+
+    return hass.states.async_available_entity_id(preferred_id)
 
 
 class Entity(object):
@@ -1,10 +1,12 @@
 """Class to manage the entities for a single platform."""
 import asyncio
 from datetime import timedelta
+from timeit import default_timer as timer
 
 from homeassistant.const import DEVICE_DEFAULT_NAME
 from homeassistant.core import callback, valid_entity_id, split_entity_id
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
+from homeassistant.setup import PHASE_PLATFORM, async_record_timing
 from homeassistant.util.async_ import (
     run_callback_threadsafe, run_coroutine_threadsafe)
 import homeassistant.util.dt as dt_util
@@ -59,6 +61,7 @@ class EntityPlatform(object):
         full_name = '{}.{}'.format(self.domain, self.platform_name)
 
         logger.info("Setting up %s", full_name)
+        start = timer()
         warn_task = hass.loop.call_later(
             SLOW_SETUP_WARNING, logger.warning,
             "Setup of platform %s is taking over %s seconds.",
@@ -111,6 +114,8 @@ class EntityPlatform(object):
                 "Error while setting up platform %s", self.platform_name)
         finally:
             warn_task.cancel()
+            async_record_timing(
+                hass, full_name, PHASE_PLATFORM, start, timer())
 
     def _schedule_add_entities(self, new_entities, update_before_add=False):
         """Synchronously schedule adding entities for a single platform."""
@@ -152,15 +157,26 @@ class EntityPlatform(object):
 
         hass = self.hass
         component_entities = set(hass.states.async_entity_ids(self.domain))
+        added = []
 
         registry = await async_get_registry(hass)
 
         tasks = [
             self._async_add_entity(entity, update_before_add,
-                                   component_entities, registry)
+                                   component_entities, registry, added)
             for entity in new_entities]
 
         await asyncio.wait(tasks, loop=self.hass.loop)
+
+        # Write the initial states once all entities are prepared. Every
+        # entity still writes its own state and fires its own state change.
+        for entity in added:
+            try:
+                await entity.async_update_ha_state()
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception(
+                    "Error writing state of %s", entity.entity_id)
+
         self.async_entities_added_callback()
 
         if self._async_unsub_polling is not None or \
@@ -173,8 +189,11 @@ class EntityPlatform(object):
         )
 
     async def _async_add_entity(self, entity, update_before_add,
-                                component_entities, registry):
-        """Helper method to add an entity to the platform."""
+                                component_entities, registry, added):
+        """Helper method to add an entity to the platform.
+
+        The entity is appended to added once its state can be written.
+        """
         if entity is None:
             raise ValueError('Entity cannot be None')
 
@@ -206,7 +225,8 @@ class EntityPlatform(object):
 
             entry = registry.async_get_or_create(
                 self.domain, self.platform_name, entity.unique_id,
-                suggested_object_id=suggested_object_id)
+                suggested_object_id=suggested_object_id,
+                known_entity_ids=component_entities)
 
             if entry.disabled:
                 self.logger.info(
@@ -237,7 +257,7 @@ class EntityPlatform(object):
                                                      suggested_object_id)
 
             entity.entity_id = registry.async_generate_entity_id(
-                self.domain, suggested_object_id)
+                self.domain, suggested_object_id, component_entities)
 
         # Make sure it is valid in case an entity set the value themselves
         if not valid_entity_id(entity.entity_id):
@@ -257,7 +277,7 @@ class EntityPlatform(object):
         if hasattr(entity, 'async_added_to_hass'):
             await entity.async_added_to_hass()
 
-        await entity.async_update_ha_state()
+        added.append(entity)
 
     async def async_reset(self):
         """Remove all entities and reset data.
@@ -12,7 +12,6 @@ from disk.
 """
 
 from collections import OrderedDict
-from itertools import chain
 import logging
 import os
 import weakref
@@ -21,7 +20,7 @@ import attr
 
 from ..core import callback, split_entity_id
 from ..loader import bind_hass
-from ..util import ensure_unique_string, slugify
+from ..util import slugify
 from ..util.yaml import load_yaml, save_yaml
 
 PATH_REGISTRY = 'entity_registry.yaml'
@@ -77,6 +76,10 @@ class EntityRegistry:
         self.entities = None
         self._load_task = None
         self._sched_save = None
+        # Entity ids by domain, platform and unique id of the entities they
+        # were built from, to find an entity without scanning all of them
+        self._unique_ids = {}
+        self._unique_ids_of = None
 
     @callback
     def async_is_registered(self, entity_id):
@@ -84,39 +87,53 @@ class EntityRegistry:
         return entity_id in self.entities
 
     @callback
-    def async_generate_entity_id(self, domain, suggested_object_id):
+    def async_generate_entity_id(self, domain, suggested_object_id,
+                                 known_entity_ids=None):
         """Generate an entity ID that does not conflict.
 
-        Conflicts checked against registered and currently existing entities.
+        Conflicts checked against registered and currently existing entities,
+        and the known entity ids if given.
         """
-        return ensure_unique_string(
+        return self.hass.states.async_available_entity_id(
             '{}.{}'.format(domain, slugify(suggested_object_id)),
-            chain(self.entities.keys(),
-                  self.hass.states.async_entity_ids(domain))
-        )
+            self.entities, known_entity_ids or ())
 
     @callback
     def async_get_or_create(self, domain, platform, unique_id, *,
-                            suggested_object_id=None):
+                            suggested_object_id=None, known_entity_ids=None):
         """Get entity. Create if it doesn't exist."""
-        for entity in self.entities.values():
-            if entity.domain == domain and entity.platform == platform and \
-               entity.unique_id == unique_id:
-                return entity
+        unique_ids = self._async_unique_ids()
+        entity_id = unique_ids.get((domain, platform, unique_id))
+
+        if entity_id is not None:
+            return self.entities[entity_id]
 
         entity_id = self.async_generate_entity_id(
-            domain, suggested_object_id or '{}_{}'.format(platform, unique_id))
+            domain, suggested_object_id or '{}_{}'.format(platform, unique_id),
+            known_entity_ids)
         entity = RegistryEntry(
             entity_id=entity_id,
             unique_id=unique_id,
             platform=platform,
         )
         self.entities[entity_id] = entity
+        unique_ids[(domain, platform, unique_id)] = entity_id
         _LOGGER.info('Registered new %s.%s entity: %s',
                      domain, platform, entity_id)
         self.async_schedule_save()
         return entity
 
+    @callback
+    def _async_unique_ids(self):
+        """Return the entity ids by domain, platform and unique id."""
+        if self._unique_ids_of is not self.entities:
+            self._unique_ids = {
+                (entry.domain, entry.platform, entry.unique_id):
+                entry.entity_id for entry in self.entities.values()}
+            self._unique_ids_of = self.entities
+
+        return self._unique_ids
+
     @callback
     def async_update_entity(self, entity_id, *, name=_UNDEF):
         """Update properties of an entity."""
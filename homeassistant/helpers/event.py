@@ -1,6 +1,9 @@
 """Helpers for listening to events."""
 from datetime import timedelta
 import functools as ft
+import heapq
+import itertools
+import logging
 
 from homeassistant.loader import bind_hass
 from homeassistant.helpers.sun import get_astral_event_next
@@ -10,6 +13,11 @@ from ..const import (
 from ..util import dt as dt_util
 from ..util.async_ import run_callback_threadsafe
 
+DATA_STATE_CHANGE_DISPATCHER = 'event_state_change_dispatcher'
+DATA_POINT_IN_TIME_SCHEDULER = 'event_point_in_time_scheduler'
+
+_LOGGER = logging.getLogger(__name__)
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -36,6 +44,83 @@ def threaded_listener_factory(async_factory):
     return factory
 
 
+class StateChangeDispatcher(object):
+    """Route state_changed events to the listeners of that entity.
+
+    A single bus listener is shared by all state change trackers so a state
+    change only calls the listeners of the entity that changed and the ones
+    tracking all entities.
+    """
+
+    def __init__(self, hass):
+        """Initialize the dispatcher."""
+        self.hass = hass
+        # Lists are replaced instead of mutated so dispatching does not need
+        # to take a copy when a listener removes itself.
+        self._listeners = {}
+        self._unsub = None
+
+    @callback
+    def async_listeners(self):
+        """Return dictionary with entity ids and the number of listeners.
+
+        This method must be run in the event loop.
+        """
+        return {key: len(self._listeners[key]) for key in self._listeners}
+
+    @callback
+    def async_listen(self, entity_ids, listener):
+        """Register a callback listener for entity ids or MATCH_ALL.
+
+        Returns a function that can be called to remove the listener.
+        """
+        entity_ids = tuple(dict.fromkeys(entity_ids))
+
+        for entity_id in entity_ids:
+            self._listeners[entity_id] = \
+                self._listeners.get(entity_id, []) + [listener]
+
+        if self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed)
+
+        @callback
+        def remove_listener():
+            """Remove the listener."""
+            self._async_remove(entity_ids, listener)
+
+        return remove_listener
+
+    @callback
+    def _async_remove(self, entity_ids, listener):
+        """Remove a listener from the given entity ids."""
+        for entity_id in entity_ids:
+            listeners = self._listeners.get(entity_id)
+            if listeners is None or listener not in listeners:
+                continue
+
+            if len(listeners) == 1:
+                self._listeners.pop(entity_id)
+            else:
+                self._listeners[entity_id] = \
+                    [lst for lst in listeners if lst is not listener]
+
+        if not self._listeners and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_state_changed(self, event):
+        """Call the listeners tracking the changed entity."""
+        for key in (event.data.get('entity_id'), MATCH_ALL):
+            for listener in self._listeners.get(key, ()):
+                try:
+                    listener(event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error running state change listener "
+                                      "%s for %s", listener, event)
+
+
 @callback
 @bind_hass
 def async_track_state_change(hass, entity_ids, action, from_state=None,
@@ -54,7 +139,7 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
 
     # Ensure it is a lowercase list with entity ids we want to match on
     if entity_ids == MATCH_ALL:
-        pass
+        entity_ids = (MATCH_ALL,)
     elif isinstance(entity_ids, str):
         entity_ids = (entity_ids.lower(),)
     else:
@@ -63,10 +148,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     @callback
     def state_change_listener(event):
         """Handle specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         old_state = event.data.get('old_state')
         if old_state is not None:
             old_state = old_state.state
@@ -80,7 +161,12 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
                                event.data.get('old_state'),
                                event.data.get('new_state'))
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    dispatcher = hass.data.get(DATA_STATE_CHANGE_DISPATCHER)
+    if dispatcher is None:
+        dispatcher = hass.data[DATA_STATE_CHANGE_DISPATCHER] = \
+            StateChangeDispatcher(hass)
+
+    return dispatcher.async_listen(entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
@@ -185,35 +271,108 @@ def async_track_point_in_time(hass, action, point_in_time):
 track_point_in_time = threaded_listener_factory(async_track_point_in_time)
 
 
-@callback
-@bind_hass
-def async_track_point_in_utc_time(hass, action, point_in_time):
-    """Add a listener that fires once after a specific point in UTC time."""
-    # Ensure point_in_time is UTC
-    point_in_time = dt_util.as_utc(point_in_time)
+class PointInTimeScheduler(object):
+    """Run actions once a point in time has passed.
+
+    Pending actions are kept in a single heap ordered by deadline. The
+    scheduler listens once for time_changed events and only does work for
+    the actions that are due, independent of the number of pending actions.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._unsub = None
+
+    def __len__(self):
+        """Return the number of pending actions."""
+        return len(self._heap) - self._cancelled
 
     @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
+    def async_schedule(self, action, point_in_time):
+        """Schedule action to run once point_in_time has passed.
+
+        Returns a function that can be called to cancel the action.
+        """
+        # [deadline, sequence, action]. The action is set to None when the
+        # entry is cancelled or has been run.
+        entry = [point_in_time, next(self._counter), action]
+        heapq.heappush(self._heap, entry)
+
+        if self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_time_changed)
+
+        @callback
+        def cancel():
+            """Cancel the scheduled action."""
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._cancelled += 1
+            self._async_compact()
+
+        return cancel
 
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
+    @callback
+    def _async_compact(self):
+        """Drop cancelled entries once they make up half of the heap."""
+        if self._cancelled * 2 < len(self._heap):
             return
 
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
+        self._heap = [entry for entry in self._heap if entry[2] is not None]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
 
-        hass.async_run_job(action, now)
+        if not self._heap and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_time_changed(self, event):
+        """Run the actions that are due."""
+        now = event.data[ATTR_NOW]
+        heap = self._heap
+        due = []
+
+        # Collect first so actions scheduled by the actions we run now are
+        # only considered on the next time_changed event.
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if entry[2] is None:
+                self._cancelled -= 1
+                continue
+            due.append(entry[2])
+            entry[2] = None
+
+        for action in due:
+            try:
+                self.hass.async_run_job(action, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running scheduled action %s",
+                                  action)
+
+        if not self._heap and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+
+@callback
+@bind_hass
+def async_track_point_in_utc_time(hass, action, point_in_time):
+    """Add a listener that fires once after a specific point in UTC time."""
+    # Ensure point_in_time is UTC
+    point_in_time = dt_util.as_utc(point_in_time)
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
+    scheduler = hass.data.get(DATA_POINT_IN_TIME_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_POINT_IN_TIME_SCHEDULER] = \
+            PointInTimeScheduler(hass)
 
-    return async_unsub
+    return scheduler.async_schedule(action, point_in_time)
 
 
 track_point_in_utc_time = threaded_listener_factory(
@@ -0,0 +1,170 @@
+"""Share serialized events between event stream subscribers."""
+import json
+import logging
+
+from homeassistant.const import EVENT_TIME_CHANGED
+from homeassistant.core import callback
+from homeassistant.loader import bind_hass
+from homeassistant.util.json import JSONEncoder
+
+_LOGGER = logging.getLogger(__name__)
+DATA_EVENT_HUB = 'event_hub'
+
+
+@callback
+@bind_hass
+def async_get_event_hub(hass):
+    """Return the event hub, creating it on first use.
+
+    This method must be run in the event loop.
+    """
+    hub = hass.data.get(DATA_EVENT_HUB)
+
+    if hub is None:
+        hub = hass.data[DATA_EVENT_HUB] = EventHub(hass)
+
+    return hub
+
+
+class SerializedEvent:
+    """An event and its JSON representation, encoded on first access."""
+
+    __slots__ = ('event', '_json', '_encoded')
+
+    def __init__(self, event):
+        """Initialize a serialized event."""
+        self.event = event
+        self._json = None
+        self._encoded = False
+
+    @property
+    def json(self):
+        """Return the event encoded as JSON or None if it can't be encoded."""
+        if not self._encoded:
+            self._encoded = True
+            try:
+                self._json = json.dumps(self.event, cls=JSONEncoder)
+            except (TypeError, ValueError) as err:
+                _LOGGER.error("Unable to serialize to JSON: %s\n%s",
+                              err, self.event)
+        return self._json
+
+
+class Subscription:
+    """A subscriber of the event hub and its delivery counters."""
+
+    __slots__ = ('hub', 'event_type', 'target', 'delivered', 'dropped')
+
+    def __init__(self, hub, event_type, target):
+        """Initialize a subscription."""
+        self.hub = hub
+        self.event_type = event_type
+        self.target = target
+        self.delivered = 0
+        self.dropped = 0
+
+    def __repr__(self):
+        """Return the representation."""
+        return "<Subscription {} delivered={} dropped={}>".format(
+            self.event_type, self.delivered, self.dropped)
+
+    @callback
+    def async_unsubscribe(self):
+        """Stop forwarding events to the target.
+
+        This method must be run in the event loop.
+        """
+        self.hub.async_remove(self)
+
+
+class EventHub:
+    """Forward events to subscribers, encoding every event only once.
+
+    A single bus listener is registered per event type, shared by all
+    subscriptions to that event type. Subscribers receive a SerializedEvent;
+    the JSON is encoded by the first subscriber that asks for it and reused
+    by all others, including subscribers of other event types.
+    """
+
+    def __init__(self, hass):
+        """Initialize the event hub."""
+        self.hass = hass
+        self._subscriptions = {}
+        self._unsub_listeners = {}
+        self._last = None
+
+    @property
+    def subscriptions(self):
+        """Return all active subscriptions."""
+        return [subscription for subscriptions
+                in self._subscriptions.values()
+                for subscription in subscriptions]
+
+    @callback
+    def async_subscribe(self, event_type, target):
+        """Forward events of event_type (or MATCH_ALL) to target.
+
+        Target is a callback receiving a SerializedEvent. It returns True if
+        it queued the event, False if it had to drop it and None if it is
+        not interested. Time changed events are never forwarded.
+
+        This method must be run in the event loop.
+        """
+        subscription = Subscription(self, event_type, target)
+        subscriptions = self._subscriptions.get(event_type)
+
+        if subscriptions is None:
+            subscriptions = self._subscriptions[event_type] = []
+
+            @callback
+            def forward_event(event):
+                """Forward an event to the subscriptions."""
+                self._async_forward(subscriptions, event)
+
+            self._unsub_listeners[event_type] = self.hass.bus.async_listen(
+                event_type, forward_event)
+
+        subscriptions.append(subscription)
+        return subscription
+
+    @callback
+    def async_remove(self, subscription):
+        """Remove a subscription.
+
+        This method must be run in the event loop.
+        """
+        event_type = subscription.event_type
+        subscriptions = self._subscriptions.get(event_type)
+
+        try:
+            subscriptions.remove(subscription)
+        except (AttributeError, ValueError):
+            _LOGGER.warning("Unable to remove unknown subscription %s",
+                            subscription)
+            return
+
+        if subscription.dropped:
+            _LOGGER.debug("Removed %s", subscription)
+
+        if not subscriptions:
+            del self._subscriptions[event_type]
+            self._unsub_listeners.pop(event_type)()
+
+    @callback
+    def _async_forward(self, subscriptions, event):
+        """Hand the serialized event to every subscription."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return
+
+        serialized = self._last
+
+        if serialized is None or serialized.event is not event:
+            serialized = self._last = SerializedEvent(event)
+
+        for subscription in tuple(subscriptions):
+            result = subscription.target(serialized)
+
+            if result:
+                subscription.delivered += 1
+            elif result is False:
+                subscription.dropped += 1
@@ -1,33 +1,34 @@
 """Support for restoring entity states on startup."""
 import asyncio
+import json
 import logging
+import os
 from datetime import timedelta
 
 import async_timeout
 
-from homeassistant.core import HomeAssistant, CoreState, callback
-from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.core import HomeAssistant, CoreState, State, callback
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP)
 from homeassistant.loader import bind_hass
 from homeassistant.components.history import get_states, last_recorder_run
 from homeassistant.components.recorder import (
-    wait_connection_ready, DOMAIN as _RECORDER)
+    wait_connection_ready, DATA_INSTANCE, DOMAIN as _RECORDER)
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.remote import JSONEncoder
 import homeassistant.util.dt as dt_util
 
 RECORDER_TIMEOUT = 10
 DATA_RESTORE_CACHE = 'restore_state_cache'
+DATA_SNAPSHOT_TRACKER = 'restore_state_snapshot_tracker'
+RESTORE_STATE_FILE = '.restore_state.json'
+SNAPSHOT_INTERVAL = timedelta(minutes=15)
 _LOCK = 'restore_lock'
 _LOGGER = logging.getLogger(__name__)
 
 
 def _load_restore_cache(hass: HomeAssistant):
-    """Load the restore cache to be used by other components."""
-    @callback
-    def remove_cache(event):
-        """Remove the states cache."""
-        hass.data.pop(DATA_RESTORE_CACHE, None)
-
-    hass.bus.listen_once(EVENT_HOMEASSISTANT_START, remove_cache)
-
+    """Load the restore cache from the snapshot or the recorder."""
     last_run = last_recorder_run(hass)
 
     if last_run is None or last_run.end is None:
@@ -36,6 +37,13 @@ def _load_restore_cache(hass: HomeAssistant):
         hass.data[DATA_RESTORE_CACHE] = {}
         return
 
+    cache = _load_snapshot(hass, last_run)
+
+    if cache is not None:
+        _LOGGER.debug('Created cache from snapshot with %s', list(cache))
+        hass.data[DATA_RESTORE_CACHE] = cache
+        return
+
     last_end_time = last_run.end - timedelta(seconds=1)
     # Unfortunately the recorder_run model do not return offset-aware time
     last_end_time = last_end_time.replace(tzinfo=dt_util.UTC)
@@ -49,42 +57,136 @@ def _load_restore_cache(hass: HomeAssistant):
     _LOGGER.debug('Created cache with %s', list(hass.data[DATA_RESTORE_CACHE]))
 
 
+def _load_snapshot(hass: HomeAssistant, last_run):
+    """Load the states of the last snapshot, None if there is none.
+
+    The snapshot is only used if it was saved during the last recorder run
+    and that run ended properly. Otherwise the recorder has newer states.
+    """
+    path = hass.config.path(RESTORE_STATE_FILE)
+
+    try:
+        saved = dt_util.utc_from_timestamp(os.path.getmtime(path))
+
+        if last_run.closed_incorrect or \
+                saved < last_run.start.replace(tzinfo=dt_util.UTC):
+            _LOGGER.debug('Ignoring restore state snapshot %s saved at %s, '
+                          'it is older than the last run: %s',
+                          path, saved, last_run)
+            return None
+
+        with open(path, encoding='utf-8') as fdesc:
+            data = json.loads(fdesc.read())
+    except FileNotFoundError:
+        _LOGGER.debug('No restore state snapshot found: %s', path)
+        return None
+    except (OSError, ValueError) as err:
+        _LOGGER.warning('Unable to read restore state snapshot %s: %s',
+                        path, err)
+        return None
+
+    states = (State.from_dict(state_dict) for state_dict in data)
+    return {state.entity_id: state for state in states if state is not None}
+
+
+def _save_snapshot(hass: HomeAssistant, states):
+    """Write the states to the snapshot file, replacing the old one.
+
+    States of entities excluded from the recorder are not saved.
+    """
+    path = hass.config.path(RESTORE_STATE_FILE)
+    instance = hass.data.get(DATA_INSTANCE)
+    dumped = []
+
+    for state in states:
+        if instance is not None and \
+                not instance.entity_filter(state.entity_id):
+            continue
+
+        try:
+            dumped.append(json.dumps(
+                state, cls=JSONEncoder, separators=(',', ':')))
+        except (TypeError, ValueError):
+            _LOGGER.debug('Not saving state of %s, it can not be serialized',
+                          state.entity_id)
+
+    try:
+        with open(path + '.tmp', 'w', encoding='utf-8') as fdesc:
+            fdesc.write('[{}]'.format(','.join(dumped)))
+        os.replace(path + '.tmp', path)
+    except OSError as err:
+        _LOGGER.error('Unable to write restore state snapshot %s: %s',
+                      path, err)
+
+
+@callback
+def _async_track_snapshots(hass: HomeAssistant):
+    """Save a snapshot of all states periodically and when stopping."""
+    if DATA_SNAPSHOT_TRACKER in hass.data or \
+            _RECORDER not in hass.config.components:
+        return
+
+    @callback
+    def async_save_snapshot(*_):
+        """Save the current states in the executor."""
+        return hass.async_add_job(
+            _save_snapshot, hass, hass.states.async_all())
+
+    hass.data[DATA_SNAPSHOT_TRACKER] = async_track_time_interval(
+        hass, async_save_snapshot, SNAPSHOT_INTERVAL)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_save_snapshot)
+
+
 @bind_hass
 async def async_get_last_state(hass, entity_id: str):
-    """Restore state."""
+    """Restore state.
+
+    The states are read from the snapshot saved while Home Assistant last
+    ran, or from the recorder if there is no usable snapshot.
+    """
     if DATA_RESTORE_CACHE in hass.data:
         return hass.data[DATA_RESTORE_CACHE].get(entity_id)
 
     if _RECORDER not in hass.config.components:
         return None
 
+    _async_track_snapshots(hass)
+
     if hass.state not in (CoreState.starting, CoreState.not_running):
         _LOGGER.debug("Cache for %s can only be loaded during startup, not %s",
                       entity_id, hass.state)
         return None
 
-    try:
-        with async_timeout.timeout(RECORDER_TIMEOUT, loop=hass.loop):
-            connected = await wait_connection_ready(hass)
-    except asyncio.TimeoutError:
-        return None
-
-    if not connected:
-        return None
-
     if _LOCK not in hass.data:
         hass.data[_LOCK] = asyncio.Lock(loop=hass.loop)
 
     async with hass.data[_LOCK]:
         if DATA_RESTORE_CACHE not in hass.data:
-            await hass.async_add_job(
-                _load_restore_cache, hass)
+            try:
+                with async_timeout.timeout(RECORDER_TIMEOUT, loop=hass.loop):
+                    connected = await wait_connection_ready(hass)
+            except asyncio.TimeoutError:
+                return None
+
+            if not connected:
+                return None
+
+            await hass.async_add_job(_load_restore_cache, hass)
+
+            @callback
+            def remove_cache(event):
+                """Remove the states cache."""
+                hass.data.pop(DATA_RESTORE_CACHE, None)
+
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, remove_cache)
 
     return hass.data.get(DATA_RESTORE_CACHE, {}).get(entity_id)
 
 
 async def async_restore_state(entity, extract_info):
     """Call entity.async_restore_state with cached info."""
+    _async_track_snapshots(entity.hass)
+
     if entity.hass.state not in (CoreState.starting, CoreState.not_running):
         _LOGGER.debug("Not restoring state for %s: Hass is not starting: %s",
                       entity.entity_id, entity.hass.state)
@@ -10,6 +10,7 @@ call get_component('switch.your_platform'). In both cases the config directory
 is checked to see if it contains a user provided version. If not available it
 will check the built-in components and platforms.
 """
+import ast
 import functools as ft
 import importlib
 import logging
@@ -21,6 +22,8 @@ from types import ModuleType
 # pylint: disable=unused-import
 from typing import Dict, List, Optional, Sequence, Set  # NOQA
 
+from collections import OrderedDict
+
 from homeassistant.const import PLATFORM_FORMAT
 from homeassistant.util import OrderedSet
 
@@ -33,12 +36,26 @@ PREPARED = False
 
 DEPENDENCY_BLACKLIST = set(('config',))
 
-# List of available components
-AVAILABLE_COMPONENTS = []  # type: List[str]
+# Set of available components
+AVAILABLE_COMPONENTS = set()  # type: Set[str]
+
+# Packages to look for components in, mapped to their directory
+_COMPONENT_PATHS = OrderedDict()  # type: Dict[str, str]
 
 # Dict of loaded components mapped name => module
 _COMPONENT_CACHE = {}  # type: Dict[str, ModuleType]
 
+# Dict of components mapped name => dependencies and requirements
+_METADATA_CACHE = {}  # type: Dict[str, Dict[str, List[str]]]
+
+METADATA_DEPENDENCIES = 'dependencies'
+METADATA_REQUIREMENTS = 'requirements'
+
+_METADATA_ATTRIBUTES = {
+    'DEPENDENCIES': METADATA_DEPENDENCIES,
+    'REQUIREMENTS': METADATA_REQUIREMENTS,
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -53,8 +70,10 @@ def prepare(hass: 'HomeAssistant'):
     import homeassistant.components as components
 
     AVAILABLE_COMPONENTS.clear()
+    _COMPONENT_PATHS.clear()
+    _METADATA_CACHE.clear()
 
-    AVAILABLE_COMPONENTS.extend(
+    AVAILABLE_COMPONENTS.update(
         item[1] for item in
         pkgutil.iter_modules(components.__path__, 'homeassistant.components.'))
 
@@ -62,6 +81,8 @@ def prepare(hass: 'HomeAssistant'):
     custom_path = hass.config.path("custom_components")
 
     if os.path.isdir(custom_path):
+        _COMPONENT_PATHS['custom_components'] = custom_path
+
         # Ensure we can load custom components using Pythons import
         sys.path.insert(0, hass.config.config_dir)
 
@@ -77,12 +98,14 @@ def prepare(hass: 'HomeAssistant'):
             if fil == '__pycache__':
                 continue
             elif os.path.isdir(os.path.join(custom_path, fil)):
-                AVAILABLE_COMPONENTS.append('custom_components.{}'.format(fil))
+                AVAILABLE_COMPONENTS.add('custom_components.{}'.format(fil))
             else:
                 # For files we will strip out .py extension
-                AVAILABLE_COMPONENTS.append(
+                AVAILABLE_COMPONENTS.add(
                     'custom_components.{}'.format(fil[0:-3]))
 
+    _COMPONENT_PATHS['homeassistant.components'] = components.__path__[0]
+
     PREPARED = True
 
 
@@ -94,6 +117,7 @@ def set_component(comp_name: str, component: ModuleType) -> None:
     _check_prepared()
 
     _COMPONENT_CACHE[comp_name] = component
+    _METADATA_CACHE.pop(comp_name, None)
 
 
 def get_platform(domain: str, platform: str) -> Optional[ModuleType]:
@@ -171,6 +195,105 @@ def get_component(comp_name) -> Optional[ModuleType]:
     return None
 
 
+def get_component_metadata(comp_name: str) -> Optional[Dict[str, List[str]]]:
+    """Return the dependencies and requirements of a component or platform.
+
+    The source of a component that is not loaded yet is parsed instead of
+    imported, so its module code does not run. Only if DEPENDENCIES or
+    REQUIREMENTS are not plain literals the component is imported.
+    Returns None if the component could not be found.
+
+    Async friendly.
+    """
+    if comp_name in _METADATA_CACHE:
+        return _METADATA_CACHE[comp_name]
+
+    if comp_name in _COMPONENT_CACHE:
+        metadata = None
+    else:
+        _check_prepared()
+        path = _find_component_source(comp_name)
+        metadata = None if path is None else _read_metadata(path)
+
+    if metadata is None:
+        component = get_component(comp_name)
+
+        if component is None:
+            return None
+
+        metadata = {
+            key: list(getattr(component, attr, []))
+            for attr, key in _METADATA_ATTRIBUTES.items()}
+
+    _METADATA_CACHE[comp_name] = metadata
+
+    return metadata
+
+
+def _find_component_source(comp_name: str) -> Optional[str]:
+    """Return the path of the source file get_component would import."""
+    parts = comp_name.split('.')
+
+    for package, directory in _COMPONENT_PATHS.items():
+        if '{}.{}'.format(package, parts[0]) not in AVAILABLE_COMPONENTS:
+            continue
+
+        base = os.path.join(directory, *parts)
+
+        for path in (base + '.py', os.path.join(base, '__init__.py')):
+            if os.path.isfile(path):
+                return path
+
+    return None
+
+
+def _read_metadata(path: str) -> Optional[Dict[str, List[str]]]:
+    """Read DEPENDENCIES and REQUIREMENTS from the source of a module.
+
+    Returns None if they can not be read without running the module.
+    """
+    try:
+        with open(path, encoding='utf-8') as source:
+            tree = ast.parse(source.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    metadata = {key: [] for key in _METADATA_ATTRIBUTES.values()}
+    literals = 0
+
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+
+        target = node.targets[0]
+
+        if not isinstance(target, ast.Name) or \
+                target.id not in _METADATA_ATTRIBUTES:
+            continue
+
+        try:
+            value = ast.literal_eval(node.value)
+        except ValueError:
+            return None
+
+        if not isinstance(value, (list, tuple)):
+            return None
+
+        metadata[_METADATA_ATTRIBUTES[target.id]] = list(value)
+        literals += 1
+
+    # Also assigned in another way, ie. conditionally
+    assignments = sum(
+        1 for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store) and
+        node.id in _METADATA_ATTRIBUTES)
+
+    if assignments != literals:
+        return None
+
+    return metadata
+
+
 class Components:
     """Helper to load components."""
 
@@ -247,15 +370,15 @@ def _load_order_component(comp_name: str, load_order: OrderedSet,
 
     Async friendly.
     """
-    component = get_component(comp_name)
+    metadata = get_component_metadata(comp_name)
 
     # If None it does not exist, error already thrown by get_component.
-    if component is None:
+    if metadata is None:
         return OrderedSet()
 
     loading.add(comp_name)
 
-    for dependency in getattr(component, 'DEPENDENCIES', []):
+    for dependency in metadata[METADATA_DEPENDENCIES]:
         # Check not already loaded
         if dependency in load_order:
             continue
@@ -8,7 +8,8 @@ from timeit import default_timer as timer
 
 from homeassistant import core
 from homeassistant.const import (
-    ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED)
+    ATTR_NOW, EVENT_SERVICE_EXECUTED, EVENT_STATE_CHANGED,
+    EVENT_TIME_CHANGED)
 from homeassistant.util import dt as dt_util
 
 BENCHMARKS = {}
@@ -143,6 +144,120 @@ async def async_million_state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+# pylint: disable=invalid-name
+async def async_thousand_state_change_listeners(hass):
+    """Run state changes through 1000 listeners on distinct entities."""
+    count = 0
+    event = asyncio.Event(loop=hass.loop)
+    events_to_fire = 10**4
+    entity_ids = ['light.kitchen_{}'.format(idx) for idx in range(1000)]
+
+    @core.callback
+    def listener(*args):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == events_to_fire:
+            event.set()
+
+    for entity_id in entity_ids:
+        hass.helpers.event.async_track_state_change(
+            entity_id, listener, 'off', 'on')
+
+    events_data = [{
+        'entity_id': entity_id,
+        'old_state': core.State(entity_id, 'off'),
+        'new_state': core.State(entity_id, 'on'),
+    } for entity_id in entity_ids]
+
+    start = timer()
+
+    for idx in range(events_to_fire):
+        hass.bus.async_fire(
+            EVENT_STATE_CHANGED, events_data[idx % len(events_data)])
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def async_mqtt_dispatch(hass):
+    """Dispatch 100k MQTT messages against 1000 subscriptions."""
+    from homeassistant.components import mqtt
+
+    count = 0
+    event = asyncio.Event(loop=hass.loop)
+    messages_to_send = 10**5
+
+    client = mqtt.MQTT(
+        hass, 'localhost', 1883, None, 60, None, None, None, None, None,
+        None, mqtt.PROTOCOL_311, None, None, None)
+
+    async def perform_subscription(*args):
+        """Skip talking to a broker."""
+
+    # pylint: disable=protected-access
+    client._async_perform_subscription = perform_subscription
+
+    @core.callback
+    def listener(*args):
+        """Handle message."""
+        nonlocal count
+        count += 1
+
+        if count == messages_to_send:
+            event.set()
+
+    for idx in range(1000):
+        await client.async_subscribe(
+            'tasmota/device_{}/state'.format(idx), listener, 0, None)
+
+    messages = [
+        mqtt.Message('tasmota/device_{}/state'.format(idx), b'ON')
+        for idx in range(1000)]
+
+    start = timer()
+
+    for idx in range(messages_to_send):
+        client._mqtt_handle_message(messages[idx % len(messages)])
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+# pylint: disable=invalid-name
+async def async_ten_thousand_blocking_service_calls(hass):
+    """Wait for 10k concurrent blocking service calls."""
+    count = 0
+
+    @core.callback
+    def service(call):
+        """Handle service call."""
+        nonlocal count
+        count += 1
+
+    hass.services.async_register('benchmark', 'service', service)
+
+    # An observer, like the logbook, of every executed service
+    hass.bus.async_listen(
+        EVENT_SERVICE_EXECUTED, core.callback(lambda event: None))
+
+    start = timer()
+
+    results = await asyncio.gather(*(
+        hass.services.async_call('benchmark', 'service', blocking=True)
+        for _ in range(10**4)), loop=hass.loop)
+
+    assert all(results) and count == 10**4
+
+    return timer() - start
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(hass):
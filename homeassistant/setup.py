@@ -1,14 +1,16 @@
 """All methods needed to bootstrap a Home Assistant instance."""
 import asyncio
 import logging.handlers
+from operator import itemgetter
 from timeit import default_timer as timer
 
 from types import ModuleType
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable
 
 from homeassistant import requirements, core, loader, config as conf_util
 from homeassistant.config import async_notify_setup_error
-from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
+from homeassistant.const import (
+    EVENT_COMPONENT_LOADED, EVENT_HOMEASSISTANT_START, PLATFORM_FORMAT)
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.util.async_ import run_coroutine_threadsafe
 
@@ -19,6 +21,11 @@ ATTR_COMPONENT = 'component'
 
 DATA_SETUP = 'setup_tasks'
 DATA_DEPS_REQS = 'deps_reqs_processed'
+DATA_TIMELINE = 'setup_timeline'
+
+PHASE_PLATFORM = 'platform'
+PHASE_REQUIREMENTS = 'requirements'
+PHASE_SETUP = 'setup'
 
 SLOW_SETUP_WARNING = 10
 
@@ -56,6 +63,142 @@ async def async_setup_component(hass: core.HomeAssistant, domain: str,
     return await task
 
 
+def _build_setup_graph(domains: Iterable[str],
+                       first: Iterable[str] = ()) -> Dict[str, set]:
+    """Map the domains and all their dependencies to their dependencies.
+
+    Domains in first and their dependencies come before all other domains.
+    """
+    graph = {}
+
+    for domain in domains:
+        order = loader.load_order_component(domain)
+
+        # Empty if the component or its dependencies can not be resolved,
+        # for example a circular dependency. Setting up the domain itself
+        # will report that, so don't let it wait for anything.
+        if not order:
+            graph.setdefault(domain, set())
+            continue
+
+        for name in order:
+            if name in graph:
+                continue
+            metadata = loader.get_component_metadata(name)
+            graph[name] = set(
+                metadata[loader.METADATA_DEPENDENCIES] if metadata else ())
+
+    for name, dependencies in graph.items():
+        # Blacklisted dependencies fail the dependent, don't set them up.
+        dependencies.intersection_update(
+            dep for dep in graph if dep not in loader.DEPENDENCY_BLACKLIST)
+
+    first = [domain for domain in first if domain in graph]
+    first_stage = set()
+
+    for domain in first:
+        first_stage.update(loader.load_order_component(domain) or (domain,))
+
+    for name, dependencies in graph.items():
+        if name not in first_stage:
+            dependencies.update(first)
+
+    return graph
+
+
+async def async_setup_components(hass: core.HomeAssistant,
+                                 domains: Iterable[str], config: Dict,
+                                 first: Iterable[str] = (),
+                                 max_concurrent: Optional[int] = None) \
+                                 -> Dict[str, bool]:
+    """Set up components and their dependencies as early as possible.
+
+    A component is set up as soon as all its dependencies are, with at most
+    max_concurrent setups running at the same time.
+
+    This method is a coroutine.
+    """
+    graph = _build_setup_graph(domains, first)
+    tasks = {}
+
+    if max_concurrent:
+        semaphore = asyncio.Semaphore(max_concurrent, loop=hass.loop)
+    else:
+        semaphore = None
+
+    async def setup_when_ready(domain):
+        """Set up a domain after its dependencies."""
+        dependencies = [tasks[dep] for dep in graph[domain]]
+
+        if dependencies:
+            await asyncio.wait(dependencies, loop=hass.loop)
+
+        if semaphore is None:
+            return await async_setup_component(hass, domain, config)
+
+        async with semaphore:
+            return await async_setup_component(hass, domain, config)
+
+    for domain in graph:
+        tasks[domain] = hass.async_add_job(setup_when_ready(domain))
+
+    if tasks:
+        await asyncio.wait(tasks.values(), loop=hass.loop)
+
+    return {domain: task.exception() is None and task.result()
+            for domain, task in tasks.items()}
+
+
+@core.callback
+def async_record_timing(hass: core.HomeAssistant, name: str, phase: str,
+                        start: float, end: float) -> None:
+    """Record how long a phase of setting up a component or platform took.
+
+    Only phases until Home Assistant has started are recorded.
+    """
+    timeline = hass.data.get(DATA_TIMELINE)
+
+    if timeline is None:
+        timeline = hass.data[DATA_TIMELINE] = []
+
+        @core.callback
+        def stop_recording(event):
+            """Freeze the timeline once Home Assistant has started."""
+            hass.data[DATA_TIMELINE] = tuple(timeline)
+
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_START, stop_recording)
+
+    elif isinstance(timeline, tuple):
+        return
+
+    timeline.append({
+        'name': name,
+        'phase': phase,
+        'start': start,
+        'duration': end - start,
+    })
+
+
+@core.callback
+def async_get_timeline(hass: core.HomeAssistant) -> list:
+    """Return the recorded setup phases, ordered by when they started.
+
+    Start times are in seconds relative to the first recorded phase.
+    """
+    timeline = sorted(hass.data.get(DATA_TIMELINE, []),
+                      key=itemgetter('start'))
+
+    if not timeline:
+        return []
+
+    offset = timeline[0]['start']
+
+    return [dict(entry, start=round(entry['start'] - offset, 3),
+                 duration=round(entry['duration'], 3))
+            for entry in timeline]
+
+
 async def _async_process_dependencies(hass, config, name, dependencies):
     """Ensure all dependencies are set up."""
     blacklisted = [dep for dep in dependencies
@@ -151,6 +294,7 @@ async def _async_setup_component(hass: core.HomeAssistant,
         end = timer()
         if warn_task:
             warn_task.cancel()
+        async_record_timing(hass, domain, PHASE_SETUP, start, end)
     _LOGGER.info("Setup of domain %s took %.1f seconds.", domain, end - start)
 
     if result is False:
@@ -234,8 +378,10 @@ async def async_process_deps_reqs(hass, config, name, module):
             raise HomeAssistantError("Could not setup all dependencies.")
 
     if not hass.config.skip_pip and hasattr(module, 'REQUIREMENTS'):
+        start = timer()
         req_success = await requirements.async_process_requirements(
             hass, name, module.REQUIREMENTS)
+        async_record_timing(hass, name, PHASE_REQUIREMENTS, start, timer())
 
         if not req_success:
             raise HomeAssistantError("Could not install all requirements.")
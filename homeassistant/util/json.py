@@ -1,4 +1,5 @@
 """JSON utility functions."""
+from datetime import datetime
 import logging
 from typing import Union, List, Dict
 
@@ -11,6 +12,25 @@ _LOGGER = logging.getLogger(__name__)
 _UNDEFINED = object()
 
 
+class JSONEncoder(json.JSONEncoder):
+    """JSONEncoder that supports Home Assistant objects."""
+
+    # pylint: disable=method-hidden
+    def default(self, o):
+        """Convert Home Assistant objects.
+
+        Hand other objects to the original method.
+        """
+        if isinstance(o, datetime):
+            return o.isoformat()
+        elif isinstance(o, set):
+            return list(o)
+        elif hasattr(o, 'as_dict'):
+            return o.as_dict()
+
+        return json.JSONEncoder.default(self, o)
+
+
 def load_json(filename: str, default: Union[List, Dict] = _UNDEFINED) \
         -> Union[List, Dict]:
     """Load JSON data from a file and return as dict or list.
@@ -1,10 +1,12 @@
 """YAML utility functions."""
+import hashlib
 import logging
 import os
 import sys
 import fnmatch
 from collections import OrderedDict
-from typing import Union, List, Dict
+from io import StringIO
+from typing import Union, List, Dict, Optional, Tuple  # NOQA
 
 import yaml
 try:
@@ -24,6 +26,9 @@ _SECRET_NAMESPACE = 'homeassistant'
 SECRET_YAML = 'secrets.yaml'
 __SECRET_CACHE = {}  # type: Dict
 
+# Dict of file names mapped to a hash of their content and parsed YAML node
+_NODE_CACHE = {}  # type: Dict[str, Tuple[bytes, Optional[yaml.nodes.Node]]]
+
 
 class NodeListClass(list):
     """Wrapper class to be able to add attributes on a list."""
@@ -61,13 +66,63 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+# Parse with libyaml if available. The nodes are always constructed by
+# SafeLineLoader, so our tags work with both.
+_NODE_LOADER = getattr(yaml, 'CSafeLoader', SafeLineLoader)
+
+
+def _parse_yaml(fname: str, content: str) -> Optional[yaml.nodes.Node]:
+    """Parse the content of a YAML file into a node.
+
+    The node of the file is reused as long as its content does not change.
+    The secrets file is never cached.
+    """
+    if os.path.basename(fname) == SECRET_YAML:
+        return _compose_yaml(fname, content)
+
+    digest = hashlib.sha1(content.encode('utf-8')).digest()
+    cached = _NODE_CACHE.get(fname)
+
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    node = _compose_yaml(fname, content)
+    _NODE_CACHE[fname] = (digest, node)
+    return node
+
+
+def _compose_yaml(fname: str, content: str) -> Optional[yaml.nodes.Node]:
+    """Parse the content of a YAML file into a node."""
+    stream = StringIO(content)
+    stream.name = fname
+    loader = _NODE_LOADER(stream)
+
+    try:
+        return loader.get_single_node()
+    finally:
+        loader.dispose()
+
+
 def load_yaml(fname: str) -> Union[List, Dict]:
     """Load a YAML file."""
     try:
         with open(fname, encoding='utf-8') as conf_file:
-            # If configuration file is empty YAML returns None
-            # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
+            content = conf_file.read()
+
+        node = _parse_yaml(fname, content)
+
+        # If configuration file is empty YAML returns None
+        # We convert that to an empty dict
+        if node is None:
+            return OrderedDict()
+
+        loader = SafeLineLoader('')
+        loader.name = fname
+
+        try:
+            return loader.construct_document(node) or OrderedDict()
+        finally:
+            loader.dispose()
     except yaml.YAMLError as exc:
         _LOGGER.error(exc)
         raise HomeAssistantError(exc)
@@ -76,6 +131,11 @@ def load_yaml(fname: str) -> Union[List, Dict]:
         raise HomeAssistantError(exc)
 
 
+def clear_yaml_cache() -> None:
+    """Clear the cache of parsed YAML files."""
+    _NODE_CACHE.clear()
+
+
 def dump(_dict: dict) -> str:
     """Dump YAML to a string and remove null."""
     return yaml.safe_dump(
@@ -186,14 +246,14 @@ def _ordered_dict(loader: SafeLineLoader,
         try:
             hash(key)
         except TypeError:
-            fname = getattr(loader.stream, 'name', '')
+            fname = loader.name
             raise yaml.MarkedYAMLError(
                 context="invalid key: \"{}\"".format(key),
                 context_mark=yaml.Mark(fname, 0, line, -1, None, None)
             )
 
         if key in seen:
-            fname = getattr(loader.stream, 'name', '')
+            fname = loader.name
             _LOGGER.error(
                 'YAML file %s contains duplicate key "%s". '
                 'Check lines %d and %d.', fname, key, seen[key], line)
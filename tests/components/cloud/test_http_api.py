@@ -5,7 +5,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 from jose import jwt
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components.cloud import DOMAIN, auth_api, iot
 
 from tests.common import mock_coro
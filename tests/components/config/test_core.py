@@ -2,7 +2,7 @@
 import asyncio
 from unittest.mock import patch
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components import config
 from tests.common import mock_coro
 
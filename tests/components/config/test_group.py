@@ -3,7 +3,7 @@ import asyncio
 import json
 from unittest.mock import patch, MagicMock
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components import config
 
 
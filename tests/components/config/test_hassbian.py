@@ -3,7 +3,7 @@ import asyncio
 import os
 from unittest.mock import patch
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components import config
 from homeassistant.components.config.hassbian import (
     HassbianSuitesView, HassbianSuiteInstallView)
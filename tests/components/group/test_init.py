@@ -8,8 +8,9 @@ from unittest.mock import patch
 from homeassistant.setup import setup_component, async_setup_component
 from homeassistant.const import (
     STATE_ON, STATE_OFF, STATE_HOME, STATE_UNKNOWN, ATTR_ICON, ATTR_HIDDEN,
-    ATTR_ASSUMED_STATE, STATE_NOT_HOME, ATTR_FRIENDLY_NAME)
+    ATTR_ASSUMED_STATE, STATE_NOT_HOME, ATTR_FRIENDLY_NAME, ATTR_ENTITY_ID)
 import homeassistant.components.group as group
+from homeassistant.helpers.event import DATA_STATE_CHANGE_DISPATCHER
 
 from tests.common import get_test_home_assistant, assert_setup_component
 
@@ -164,6 +165,49 @@ class TestComponentsGroup(unittest.TestCase):
                          sorted(group.expand_entity_ids(
                              self.hass, [test_group.entity_id])))
 
+    def test_expand_entity_ids_nested_cycle(self):
+        """Test nested groups that contain each other expand in order."""
+        self.hass.states.set('group.outer', STATE_ON, {
+            ATTR_ENTITY_ID: ['light.a', 'group.inner', 'light.d']})
+        self.hass.states.set('group.inner', STATE_ON, {
+            ATTR_ENTITY_ID: ['light.b', 'group.outer', 'light.A', 'light.c']})
+
+        self.assertEqual(
+            ['light.a', 'light.b', 'light.c', 'light.d'],
+            group.expand_entity_ids(self.hass, ['group.outer']))
+        self.assertEqual(
+            ['light.b', 'light.a', 'light.d', 'light.c'],
+            group.expand_entity_ids(self.hass, ['group.inner']))
+
+    def test_expand_entity_ids_cached(self):
+        """Test expansions are cached until the members of a group change."""
+        self.hass.states.set('group.outer', STATE_ON, {
+            ATTR_ENTITY_ID: ('light.a', 'group.inner')})
+        self.hass.states.set('group.inner', STATE_ON, {
+            ATTR_ENTITY_ID: ('light.b',)})
+
+        self.assertEqual(['light.a', 'light.b'],
+                         group.expand_entity_ids(self.hass, ['group.outer']))
+
+        with patch('homeassistant.components.group._walk_group') as walk:
+            # Group state changes without member changes
+            self.hass.states.set(
+                'group.inner', STATE_OFF,
+                self.hass.states.get('group.inner').attributes)
+            self.assertEqual(
+                ['light.a', 'light.b'],
+                group.expand_entity_ids(self.hass, ['group.outer']))
+        assert not walk.called
+
+        self.hass.states.set('group.inner', STATE_ON, {
+            ATTR_ENTITY_ID: ('light.b', 'light.c')})
+        self.assertEqual(['light.a', 'light.b', 'light.c'],
+                         group.expand_entity_ids(self.hass, ['group.outer']))
+
+        self.hass.states.remove('group.inner')
+        self.assertEqual(['light.a'],
+                         group.expand_entity_ids(self.hass, ['group.outer']))
+
     def test_expand_entity_ids_ignores_non_strings(self):
         """Test that non string elements in lists are ignored."""
         self.assertEqual([], group.expand_entity_ids(self.hass, [5, True]))
@@ -336,6 +380,43 @@ class TestComponentsGroup(unittest.TestCase):
                          self.hass.states.get(
                              group.ENTITY_ID_FORMAT.format('peeps')).state)
 
+    def test_group_counts_member_changes(self):
+        """Test member changes update the group without a recount."""
+        for idx in range(5):
+            self.hass.states.set('light.count_{}'.format(idx), STATE_OFF)
+        test_group = group.Group.create_group(
+            self.hass, 'counted',
+            ['light.count_{}'.format(idx) for idx in range(5)])
+        entity_id = test_group.entity_id
+
+        with patch.object(test_group, '_async_recount') as recount:
+            self.hass.states.set('light.count_1', STATE_ON)
+            self.hass.states.set('light.count_3', STATE_ON)
+            self.hass.block_till_done()
+            self.assertEqual(STATE_ON, self.hass.states.get(entity_id).state)
+
+            self.hass.states.set('light.count_1', STATE_OFF)
+            self.hass.block_till_done()
+            self.assertEqual(STATE_ON, self.hass.states.get(entity_id).state)
+
+            self.hass.states.set('light.count_3', 'unavailable')
+            self.hass.block_till_done()
+            self.assertEqual(STATE_OFF, self.hass.states.get(entity_id).state)
+
+            self.hass.states.set('light.count_4', STATE_OFF,
+                                 {ATTR_ASSUMED_STATE: True})
+            self.hass.block_till_done()
+            self.assertTrue(self.hass.states.get(entity_id)
+                            .attributes.get(ATTR_ASSUMED_STATE))
+
+            self.hass.states.set('light.count_4', STATE_ON)
+            self.hass.block_till_done()
+            state = self.hass.states.get(entity_id)
+            self.assertEqual(STATE_ON, state.state)
+            self.assertIsNone(state.attributes.get(ATTR_ASSUMED_STATE))
+
+        assert not recount.called
+
     def test_reloading_groups(self):
         """Test reloading the group config."""
         assert setup_component(self.hass, 'group', {'group': {
@@ -356,7 +437,11 @@ class TestComponentsGroup(unittest.TestCase):
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.all_tests', 'group.empty_group', 'group.second_group',
              'group.test_group']
-        assert self.hass.bus.listeners['state_changed'] == 3
+        assert self.hass.bus.listeners['state_changed'] == 1
+        tracked = self.hass.data[DATA_STATE_CHANGE_DISPATCHER]
+        assert tracked.async_listeners() == {
+            'light.bowl': 1, 'hello.world': 1, 'sensor.happy': 1,
+            'test.one': 1, 'test.two': 1}
 
         with patch('homeassistant.config.load_yaml_config_file', return_value={
             'group': {
@@ -370,7 +455,9 @@ class TestComponentsGroup(unittest.TestCase):
 
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.all_tests', 'group.hello']
-        assert self.hass.bus.listeners['state_changed'] == 2
+        assert self.hass.bus.listeners['state_changed'] == 1
+        assert tracked.async_listeners() == {
+            'light.bowl': 1, 'test.one': 1, 'test.two': 1}
 
     def test_changing_group_visibility(self):
         """Test that a group can be hidden and shown."""
@@ -4,7 +4,7 @@ from hashlib import sha1
 
 import pytest
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 import homeassistant.components.mailbox as mailbox
 
 
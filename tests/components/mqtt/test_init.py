@@ -616,3 +616,65 @@ def test_mqtt_subscribes_topics_on_connect(hass):
     }
     calls = {call[1][1]: call[1][2] for call in hass.add_job.mock_calls}
     assert calls == expected
+
+
+def test_topic_trie_match():
+    """Test matching topics against the subscription trie."""
+    trie = mqtt.TopicTrie()
+    subs = {topic: mqtt.Subscription(topic, None) for topic in (
+        'home/kitchen/light', 'home/+/light', 'home/#', '#', '+/+',
+        'home/+/+/state')}
+    for sub in subs.values():
+        trie.add(sub)
+
+    def match(topic):
+        """Return the matching subscription topics."""
+        return sorted(sub.topic for sub in trie.match(topic))
+
+    assert match('home/kitchen/light') == \
+        ['#', 'home/#', 'home/+/light', 'home/kitchen/light']
+    assert match('home/hall/light') == ['#', 'home/#', 'home/+/light']
+    assert match('home') == ['#', 'home/#']
+    assert match('home/hall') == ['#', '+/+', 'home/#']
+    assert match('homes/hall/light') == ['#']
+    assert match('home/hall/lamp/state') == ['#', 'home/#', 'home/+/+/state']
+
+    trie.remove(subs['#'])
+    trie.remove(subs['home/#'])
+    trie.remove(subs['home/+/+/state'])
+    assert match('home/hall/lamp/state') == []
+    assert match('home/kitchen/light') == \
+        ['home/+/light', 'home/kitchen/light']
+
+    for topic in ('home/kitchen/light', 'home/+/light', '+/+'):
+        trie.remove(subs[topic])
+    assert trie._root.is_empty
+
+
+@asyncio.coroutine
+def test_mqtt_messages_processed_in_batches(hass):
+    """Test messages from the paho thread are handled in one batch."""
+    yield from async_mock_mqtt_client(hass)
+    calls = []
+
+    @callback
+    def record_calls(*args):
+        """Record calls."""
+        calls.append(args)
+
+    yield from mqtt.async_subscribe(hass, 'test/+', record_calls)
+
+    client = hass.data['mqtt']
+    with mock.patch.object(hass.loop, 'call_soon_threadsafe') as mock_call:
+        for idx in range(5):
+            client._mqtt_on_message(
+                None, None, mqtt.Message('test/{}'.format(idx), b'on'))
+
+    # The loop is only woken up once for the whole batch
+    assert len(mock_call.mock_calls) == 1
+    mock_call.mock_calls[0][1][0]()
+
+    assert [call[0] for call in calls] == \
+        ['test/{}'.format(idx) for idx in range(5)]
+    assert client.last_batch_size == 5
+    assert client.max_batch_size == 5
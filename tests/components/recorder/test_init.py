@@ -5,12 +5,15 @@ from unittest.mock import patch
 
 import pytest
 
+import homeassistant.core as ha
 from homeassistant.core import callback
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import (
+    EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
 from homeassistant.components.recorder import Recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.util import session_scope
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    States, Events, StateAttributes)
 
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -202,3 +205,106 @@ def test_recorder_setup_failure():
         rec.join()
 
     hass.stop()
+
+
+def test_saving_batch(hass_recorder):
+    """Test events queued together are committed in a single batch."""
+    hass = hass_recorder({'commit_interval': 0.5, 'max_batch_size': 100})
+    instance = hass.data[DATA_INSTANCE]
+
+    with patch.object(instance, '_commit_batch',
+                      wraps=instance._commit_batch) as commit_batch:
+        for idx in range(5):
+            hass.states.set('test.batch_{}'.format(idx), 'on')
+        hass.block_till_done()
+        instance.block_till_done()
+
+    assert commit_batch.call_count == 1
+    assert instance.last_batch_size == 5
+    assert instance.last_batch_latency is not None
+    assert instance.queue_depth == 0
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        assert len(db_states) == 5
+        event_ids = set(state.event_id for state in db_states)
+        assert len(event_ids) == 5
+        assert session.query(Events).filter(
+            Events.event_id.in_(event_ids)).count() == 5
+
+
+def test_saving_shared_attributes(hass_recorder):
+    """Test states with the same attributes share a single row."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+
+    for state in ('on', 'off', 'on'):
+        hass.states.set('test.shared', state, {'brightness': 100})
+        hass.block_till_done()
+        instance.block_till_done()
+    hass.states.set('test.other', 'on', {'brightness': 100})
+    hass.states.set('test.shared', 'on', {'brightness': 50})
+    hass.block_till_done()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(StateAttributes).count() == 2
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert len(db_states) == 5
+        assert all(state.attributes is None for state in db_states)
+        assert len(set(state.attributes_id for state in db_states[:4])) == 1
+
+        states = [state.to_native() for state in db_states]
+        assert states[0].attributes == {'brightness': 100}
+        assert states[4].attributes == {'brightness': 50}
+        # Each distinct blob is only decoded once per session
+        assert db_states[0].state_attributes is db_states[3].state_attributes
+        assert db_states[0].state_attributes.to_native() is \
+            db_states[3].state_attributes.to_native()
+
+
+def _state_changed_event(entity_id, state):
+    """Create a state changed event."""
+    return ha.Event(EVENT_STATE_CHANGED, {
+        'entity_id': entity_id,
+        'new_state': ha.State(entity_id, state)})
+
+
+def test_queue_overflow():
+    """Test state changes are coalesced and events dropped when full."""
+    hass = get_test_home_assistant()
+    rec = Recorder(hass, keep_days=7, purge_interval=2,
+                   uri='sqlite://', include={}, exclude={'domains': ['skip']},
+                   max_queue_size=3)
+
+    rec.event_listener(ha.Event(EVENT_TIME_CHANGED))
+    rec.event_listener(_state_changed_event('skip.entity', 'on'))
+    assert rec.queue_depth == 0
+
+    first = _state_changed_event('test.light', 'on')
+    queued = _state_changed_event('test.light', 'off')
+    rec.event_listener(first)
+    rec.event_listener(queued)
+    rec.event_listener(ha.Event('test_event'))
+    assert rec.queue_depth == 3
+
+    newest = _state_changed_event('test.light', 'dim')
+    rec.event_listener(_state_changed_event('test.light', 'on'))
+    rec.event_listener(newest)
+    rec.event_listener(_state_changed_event('test.other', 'on'))
+    rec.event_listener(ha.Event('test_event'))
+    assert rec.queue_depth == 3
+    assert rec.coalesced == 2
+    assert rec.dropped == 2
+
+    recorded = [rec._dequeued(rec.queue.get_nowait()) for _ in range(3)]
+    assert recorded[0] is first
+    assert recorded[1] is newest
+    assert recorded[2].event_type == 'test_event'
+
+    with patch('homeassistant.components.recorder._LOGGER') as mock_logger:
+        rec.async_log_metrics()
+    assert mock_logger.debug.call_args[0][1:] == (0, 3, 2, 2, 0, None)
+    assert hass.states.async_all() == []
+
+    hass.stop()
@@ -6,7 +6,7 @@ from unittest.mock import patch, call
 import pytest
 from sqlalchemy import create_engine
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components.recorder import wait_connection_ready, migration
 from homeassistant.components.recorder.models import SCHEMA_VERSION
 from homeassistant.components.recorder.const import DATA_INSTANCE
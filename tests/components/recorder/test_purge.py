@@ -7,7 +7,8 @@ from unittest.mock import patch
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.purge import purge_old_data
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    States, Events, StateAttributes)
 from homeassistant.components.recorder.util import session_scope
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -132,6 +133,97 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 3 states left after purging
             self.assertEqual(states.count(), 3)
 
+    def test_purge_in_batches(self):
+        """Test purging deletes a bounded number of rows per run."""
+        self._add_test_events()
+        self._add_test_states()
+        instance = self.hass.data[DATA_INSTANCE]
+
+        with session_scope(hass=self.hass) as session, \
+                patch('homeassistant.components.recorder.purge.'
+                      'MAX_ROWS_TO_PURGE', 2):
+            states = session.query(States)
+            events = session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%"))
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 5
+            assert events.count() == 5
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 3
+            assert events.count() == 3
+
+            assert purge_old_data(instance, 4, repack=False)
+            assert 'iamprotected' in (state.state for state in states)
+
+    def test_purge_service_continues_in_batches(self):
+        """Test the recorder keeps purging until everything is purged."""
+        self._add_test_events()
+        self._add_test_states()
+
+        with session_scope(hass=self.hass) as session, \
+                patch('homeassistant.components.recorder.purge.'
+                      'MAX_ROWS_TO_PURGE', 1), \
+                patch('homeassistant.components.recorder.purge.'
+                      'purge_old_data', wraps=purge_old_data) as purge:
+            self.hass.services.call('recorder', 'purge', {'keep_days': 4})
+            self.hass.block_till_done()
+            self.hass.data[DATA_INSTANCE].block_till_done()
+
+            assert purge.call_count > 4
+            assert session.query(States).count() == 3
+            assert session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%")).count() == 3
+
+    def test_purge_unused_shared_attributes(self):
+        """Test deleting shared attributes without states."""
+        now = datetime.now()
+        eleven_days_ago = now - timedelta(days=11)
+
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            for idx, timestamp in enumerate(
+                    (eleven_days_ago, eleven_days_ago, now)):
+                shared_attrs = json.dumps({'idx': idx})
+                attributes = StateAttributes(
+                    hash=StateAttributes.hash_shared_attrs(shared_attrs),
+                    shared_attrs=shared_attrs)
+                session.add(attributes)
+                session.flush()
+                session.add(States(
+                    entity_id='test.shared_attributes',
+                    domain='test',
+                    state='on',
+                    attributes_id=attributes.attributes_id,
+                    last_changed=timestamp,
+                    last_updated=timestamp,
+                    created=timestamp,
+                ))
+
+        instance = self.hass.data[DATA_INSTANCE]
+
+        with patch('homeassistant.components.recorder.purge.'
+                   'MAX_ROWS_TO_PURGE', 1), \
+                patch('homeassistant.components.recorder.purge._LOGGER') \
+                as mock_logger:
+            # Attributes are only purged after the last batch
+            assert not purge_old_data(instance, 4, repack=False)
+            assert not purge_old_data(instance, 4, repack=False)
+
+            with session_scope(hass=self.hass) as session:
+                assert session.query(StateAttributes).count() == 3
+
+            assert not mock_logger.info.called
+            assert purge_old_data(instance, 4, repack=False)
+            assert mock_logger.info.call_count == 1
+
+        with session_scope(hass=self.hass) as session:
+            assert [json.loads(attributes.shared_attrs) for attributes
+                    in session.query(StateAttributes)] == [{'idx': 2}]
+
     def test_purge_old_events(self):
         """Test deleting old events."""
         self._add_test_events()
@@ -2,7 +2,7 @@
 import asyncio
 import logging
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from tests.common import assert_setup_component
 
 
@@ -10,7 +10,7 @@ from decimal import Decimal
 from unittest.mock import Mock
 
 import asynctest
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components.sensor.dsmr import DerivativeDSMREntity
 from homeassistant.const import STATE_UNKNOWN
 import pytest
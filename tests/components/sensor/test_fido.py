@@ -4,7 +4,7 @@ import logging
 import sys
 from unittest.mock import MagicMock
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components.sensor import fido
 from tests.common import assert_setup_component
 
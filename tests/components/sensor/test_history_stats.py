@@ -137,6 +137,78 @@ class TestHistoryStatsSensor(unittest.TestCase):
         self.assertEqual(sensor3.state, 2)
         self.assertEqual(sensor4.state, 50)
 
+    def test_measure_live_changes(self):
+        """Test live changes are accumulated without querying history."""
+        now = dt_util.utcnow()
+        t0 = now - timedelta(minutes=40)
+        t1 = t0 + timedelta(minutes=20)
+        t2 = now - timedelta(minutes=10)
+
+        fake_states = {
+            'binary_sensor.test_id': [
+                ha.State('binary_sensor.test_id', 'on', last_changed=t0),
+                ha.State('binary_sensor.test_id', 'off', last_changed=t1),
+                ha.State('binary_sensor.test_id', 'on', last_changed=t2),
+            ]
+        }
+
+        start = Template('{{ %d }}' % (now.timestamp() - 3600), self.hass)
+        end = Template('{{ now() }}', self.hass)
+
+        sensor = HistoryStatsSensor(
+            self.hass, 'binary_sensor.test_id', 'on', start, end, None,
+            'time', 'Test')
+
+        with patch('homeassistant.components.history.'
+                   'state_changes_during_period',
+                   return_value=fake_states) as mock_changes, \
+                patch('homeassistant.components.history.get_state',
+                      return_value=None):
+            sensor.update()
+            self.assertEqual(sensor.state, 0.5)
+            self.assertEqual(sensor.count, 2)
+
+            sensor._live_changes.append(
+                ((now - timedelta(minutes=5)).timestamp(), False))
+            sensor.update()
+            self.assertEqual(sensor.state, 0.42)
+            self.assertEqual(sensor.count, 2)
+
+            sensor._live_changes.append(
+                ((now - timedelta(minutes=2)).timestamp(), True))
+            sensor.update()
+            self.assertEqual(sensor.state, 0.45)
+            self.assertEqual(sensor.count, 3)
+            self.assertEqual(mock_changes.call_count, 1)
+
+            # Changes before the known period have to be loaded
+            sensor._start = Template(
+                '{{ %d }}' % (now.timestamp() - 7200), self.hass)
+            sensor.update()
+            self.assertEqual(mock_changes.call_count, 2)
+            self.assertEqual(sensor.state, 0.5)
+            self.assertEqual(sensor.count, 2)
+
+    def test_record_live_changes(self):
+        """Test state changes of the tracked entity are recorded in order."""
+        start = Template('{{ as_timestamp(now()) - 3600 }}', self.hass)
+        end = Template('{{ now() }}', self.hass)
+
+        sensor = HistoryStatsSensor(
+            self.hass, 'binary_sensor.test_id', 'on', start, end, None,
+            'time', 'Test')
+
+        with patch.object(sensor, 'async_schedule_update_ha_state') \
+                as mock_schedule:
+            self.hass.states.set('binary_sensor.test_id', 'on')
+            self.hass.states.set('binary_sensor.test_id', 'off')
+            self.hass.states.remove('binary_sensor.test_id')
+            self.hass.block_till_done()
+
+        self.assertEqual(
+            [on for _, on in sensor._live_changes], [True, False, False])
+        self.assertEqual(mock_schedule.call_count, 3)
+
     def test_wrong_date(self):
         """Test when start or end value is not a timestamp or a date."""
         good = Template('{{ now() }}', self.hass)
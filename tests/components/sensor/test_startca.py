@@ -1,6 +1,6 @@
 """Tests for the Start.ca sensor platform."""
 import asyncio
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components.sensor.startca import StartcaData
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
@@ -11,6 +11,7 @@ from unittest.mock import patch
 from datetime import datetime, timedelta
 from tests.common import init_recorder_component
 from homeassistant.components import recorder
+from homeassistant.components.sensor.statistics import StreamingStatistics
 
 
 class TestStatisticsSensor(unittest.TestCase):
@@ -171,6 +172,30 @@ class TestStatisticsSensor(unittest.TestCase):
         self.assertEqual(6, state.attributes.get('min_value'))
         self.assertEqual(14, state.attributes.get('max_value'))
 
+    def test_streaming_statistics(self):
+        """Test the streaming statistics follow a sliding window."""
+        samples = StreamingStatistics(4)
+        values = [17, 20, 15.2, 5, 3.8, 9.2, 6.7, 14, 6, 6, 1e6, 2]
+
+        for index, value in enumerate(values):
+            samples.append(value, index)
+            window = values[max(index - 3, 0):index + 1]
+
+            self.assertEqual(list(window), list(samples.values))
+            self.assertAlmostEqual(statistics.mean(window), samples.mean)
+            self.assertAlmostEqual(sum(window), samples.total)
+            self.assertEqual(statistics.median(window), samples.median)
+            self.assertEqual(min(window), samples.min)
+            self.assertEqual(max(window), samples.max)
+            if len(window) > 1:
+                self.assertAlmostEqual(
+                    statistics.variance(window), samples.variance, places=4)
+
+        samples.popleft()
+        self.assertEqual([6, 1e6, 2], list(samples.values))
+        self.assertEqual([9, 10, 11], list(samples.ages))
+        self.assertEqual(6, samples.median)
+
     def test_initialize_from_database(self):
         """Test initializing the statistics from the database."""
         # enable the recorder
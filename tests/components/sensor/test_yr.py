@@ -3,7 +3,7 @@ import asyncio
 from datetime import datetime
 from unittest.mock import patch
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 import homeassistant.util.dt as dt_util
 from tests.common import assert_setup_component, load_fixture
 
@@ -398,3 +398,16 @@ def _stream_next_event(stream):
 def _listen_count(hass):
     """Return number of event listeners."""
     return sum(hass.bus.async_listeners().values())
+
+
+@asyncio.coroutine
+def test_api_get_startup(hass, mock_api_client):
+    """Test the startup timeline contains the component setups."""
+    resp = yield from mock_api_client.get(const.URL_API_STARTUP)
+    assert resp.status == 200
+    timeline = yield from resp.json()
+
+    assert {'name': 'api', 'phase': 'setup'} in [
+        {'name': entry['name'], 'phase': entry['phase']}
+        for entry in timeline]
+    assert timeline[0]['start'] == 0
@@ -6,7 +6,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from homeassistant import config_entries
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components import discovery
 from homeassistant.util.dt import utcnow
 
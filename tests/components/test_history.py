@@ -1,6 +1,7 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
+import json
 import unittest
 from unittest.mock import patch, sentinel
 
@@ -8,6 +9,7 @@ from homeassistant.setup import setup_component, async_setup_component
 import homeassistant.core as ha
 import homeassistant.util.dt as dt_util
 from homeassistant.components import history, recorder
+from homeassistant.remote import JSONEncoder
 
 from tests.common import (
     init_recorder_component, mock_state_change_event, get_test_home_assistant)
@@ -218,6 +220,64 @@ class TestComponentHistory(unittest.TestCase):
             include_start_time_state=False)
         assert states == hist
 
+    def test_stream_significant_states(self):
+        """Test that streamed states match the significant states."""
+        zero, four, states = self.record_states()
+        expected = json.loads(json.dumps(
+            [states[entity_id] for entity_id in sorted(states)],
+            cls=JSONEncoder))
+
+        with patch.object(history, 'STREAM_CHUNK_SIZE', 2):
+            chunks = list(history.stream_significant_states(
+                self.hass, zero, four, filters=history.Filters()))
+
+        assert len(chunks) > 3
+        assert json.loads(''.join(chunks)) == expected
+
+    def test_stream_significant_states_compact(self):
+        """Test that compact output only repeats changed attributes."""
+        zero, four, states = self.record_states()
+        one_and_half = zero + timedelta(seconds=1.5)
+
+        hist = json.loads(''.join(history.stream_significant_states(
+            self.hass, one_and_half, four, filters=history.Filters(),
+            compact=True)))
+
+        assert [entity['entity_id'] for entity in hist] == sorted(states)
+        therm = hist[-2]
+        assert therm['entity_id'] == 'thermostat.test'
+        assert therm['state'] == ['20', '21', '21']
+        assert therm['last_updated'] == [
+            one_and_half.timestamp(),
+            states['thermostat.test'][1].last_updated.timestamp(),
+            states['thermostat.test'][2].last_updated.timestamp()]
+        assert therm['attributes'] == [
+            [0, {'current_temperature': 19.5}],
+            [1, {'current_temperature': 19.8}],
+            [2, {'current_temperature': 20}]]
+
+        mp2 = hist[1]
+        assert mp2['entity_id'] == 'media_player.test2'
+        assert mp2['state'] == ['YouTube']
+        assert mp2['attributes'] == [
+            [0, {'media_title': str(sentinel.mt2)}]]
+
+    def test_stream_significant_states_compact_chunked(self):
+        """Test compact output stays valid JSON when flushed in chunks."""
+        zero, four, states = self.record_states()
+        expected = json.loads(''.join(history.stream_significant_states(
+            self.hass, zero, four, filters=history.Filters(),
+            compact=True)))
+
+        with patch.object(history, 'STREAM_CHUNK_SIZE', 2):
+            chunks = list(history.stream_significant_states(
+                self.hass, zero, four, filters=history.Filters(),
+                compact=True))
+
+        assert len(chunks) > 3
+        assert json.loads(''.join(chunks)) == expected
+        assert [entity['entity_id'] for entity in expected] == sorted(states)
+
     def test_get_significant_states_entity_id(self):
         """Test that only significant states are returned for one entity."""
         zero, four, states = self.record_states()
@@ -526,3 +586,56 @@ async def test_fetch_period_api(hass, aiohttp_client):
     response = await client.get(
         '/api/history/period/{}'.format(dt_util.utcnow().isoformat()))
     assert response.status == 200
+
+
+async def test_fetch_period_api_stream(hass, aiohttp_client):
+    """Test streaming compact history from the fetch period view."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.components.recorder.wait_connection_ready()
+    start = dt_util.utcnow()
+    hass.states.async_set('light.kitchen', 'on', {'brightness': 100})
+    hass.states.async_set('light.kitchen', 'off')
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await aiohttp_client(hass.http.app)
+
+    response = await client.get(
+        '/api/history/period/{}?stream&compact'.format(start.isoformat()))
+    assert response.status == 200
+    hist = await response.json()
+    assert len(hist) == 1
+    assert hist[0]['entity_id'] == 'light.kitchen'
+    assert hist[0]['state'] == ['on', 'off']
+    assert hist[0]['attributes'] == [[0, {'brightness': 100}], [1, {}]]
+
+    response = await client.get(
+        '/api/history/period/{}?stream'.format(start.isoformat()))
+    assert response.status == 200
+    hist = await response.json()
+    assert [state['state'] for state in hist[0]] == ['on', 'off']
+
+
+async def test_fetch_period_api_stream_compact_chunked(hass, aiohttp_client):
+    """Test streamed compact history with more rows than a chunk."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.components.recorder.wait_connection_ready()
+    start = dt_util.utcnow()
+    for value in range(5):
+        hass.states.async_set('light.kitchen', value)
+        hass.states.async_set('sensor.power', value * 10)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await aiohttp_client(hass.http.app)
+
+    for query in ('compact', 'stream&compact'):
+        with patch.object(history, 'STREAM_CHUNK_SIZE', 2):
+            response = await client.get('/api/history/period/{}?{}'.format(
+                start.isoformat(), query))
+        assert response.status == 200
+        hist = json.loads(await response.text())
+        assert [entity['entity_id'] for entity in hist] == [
+            'light.kitchen', 'sensor.power']
+        assert hist[0]['state'] == ['0', '1', '2', '3', '4']
+        assert hist[1]['state'] == ['0', '10', '20', '30', '40']
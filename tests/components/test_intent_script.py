@@ -1,7 +1,7 @@
 """Test intent_script component."""
 import asyncio
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.helpers import intent
 
 from tests.common import async_mock_service
@@ -3,7 +3,7 @@
 import asyncio
 from unittest.mock import Mock
 
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components.rflink import (
     CONF_RECONNECT_INTERVAL, SERVICE_SEND_COMMAND)
 from homeassistant.const import (
@@ -4,7 +4,7 @@ import json
 import logging
 
 from homeassistant.core import callback
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from tests.common import (async_fire_mqtt_message, async_mock_intent,
                           async_mock_service)
 from homeassistant.components.snips import (SERVICE_SCHEMA_SAY,
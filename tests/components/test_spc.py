@@ -4,7 +4,7 @@ import asyncio
 import pytest
 
 from homeassistant.components import spc
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from tests.common import async_test_home_assistant
 from tests.test_util.aiohttp import mock_aiohttp_client
 from homeassistant.const import (
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from homeassistant.core import callback
-from homeassistant.bootstrap import async_setup_component
+from homeassistant.setup import async_setup_component
 from homeassistant.components import system_log
 
 _LOGGER = logging.getLogger('test_logger')
@@ -226,6 +226,81 @@ def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+@asyncio.coroutine
+def test_subscribe_entities(hass, websocket_client):
+    """Test subscribe entities command sends a snapshot and diffs."""
+    hass.states.async_set('light.kitchen', 'on', {'brightness': 100})
+    hass.states.async_set('switch.fan', 'off')
+    hass.states.async_set('sensor.other', '10')
+
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_ENTITIES,
+        'entity_ids': ['Switch.Fan'],
+        'domains': ['Light'],
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_RESULT
+    assert msg['success']
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_EVENT
+    added = msg['event']['added']
+    assert sorted(added) == ['light.kitchen', 'switch.fan']
+    assert added['light.kitchen']['state'] == 'on'
+    assert added['light.kitchen']['attributes'] == {'brightness': 100}
+
+    hass.states.async_set('sensor.other', '11')
+    hass.states.async_set('light.kitchen', 'on', {'brightness': 50})
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    changed = msg['event']['changed']
+    state = hass.states.get('light.kitchen')
+    assert changed == {'light.kitchen': {
+        'attributes': {'brightness': 50},
+        'last_updated': state.last_updated.isoformat(),
+    }}
+
+    hass.states.async_set('switch.fan', 'on', {'speed': 'low'})
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+
+    diff = msg['event']['changed']['switch.fan']
+    assert diff['state'] == 'on'
+    assert diff['attributes'] == {'speed': 'low'}
+    assert 'last_changed' in diff
+
+    hass.states.async_set('light.hallway', 'off')
+    hass.states.async_remove('light.kitchen')
+
+    with timeout(3, loop=hass.loop):
+        msg = yield from websocket_client.receive_json()
+        assert msg['event']['added']['light.hallway']['state'] == 'off'
+        msg = yield from websocket_client.receive_json()
+        assert msg['event'] == {'removed': ['light.kitchen']}
+
+
+@asyncio.coroutine
+def test_subscribe_entities_invalid_domain(websocket_client):
+    """Test subscribe entities command rejects invalid domains."""
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_ENTITIES,
+        'domains': ['light.kitchen'],
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['type'] == wapi.TYPE_RESULT
+    assert not msg['success']
+    assert msg['error']['code'] == wapi.ERR_INVALID_FORMAT
+
+
 @asyncio.coroutine
 def test_get_states(hass, websocket_client):
     """Test get_states command."""
@@ -252,6 +327,23 @@ def test_get_states(hass, websocket_client):
     assert msg['result'] == states
 
 
+@asyncio.coroutine
+def test_get_states_not_serializable(hass, websocket_client):
+    """Test get_states command replies with an error if encoding fails."""
+    hass.states.async_set('greeting.hello', 'world', {'value': object()})
+
+    yield from websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_GET_STATES,
+    })
+
+    msg = yield from websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_RESULT
+    assert not msg['success']
+    assert msg['error']['code'] == wapi.ERR_UNKNOWN_ERROR
+
+
 @asyncio.coroutine
 def test_get_services(hass, websocket_client):
     """Test get_services command."""
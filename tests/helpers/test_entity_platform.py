@@ -372,6 +372,26 @@ def test_not_adding_duplicate_entities_with_unique_id(hass):
     assert len(hass.states.async_entity_ids()) == 1
 
 
+@asyncio.coroutine
+def test_adding_entities_with_same_name(hass):
+    """Test entities with the same name added together get unique ids."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    class SlowAddedEntity(MockEntity):
+        """Entity that yields while being added."""
+
+        @asyncio.coroutine
+        def async_added_to_hass(self):
+            """Yield to the other entities being added."""
+            yield from asyncio.sleep(0, loop=hass.loop)
+
+    yield from component.async_add_entities([
+        SlowAddedEntity(name='same'), SlowAddedEntity(name='same')])
+
+    assert sorted(hass.states.async_entity_ids()) == \
+        ['test_domain.same', 'test_domain.same_2']
+
+
 @asyncio.coroutine
 def test_using_prescribed_entity_id(hass):
     """Test for using predefined entity ID."""
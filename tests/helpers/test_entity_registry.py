@@ -129,6 +129,24 @@ def test_generate_entity_considers_existing_entities(hass, registry):
         'light.kitchen_2'
 
 
+@asyncio.coroutine
+def test_generate_entity_considers_known_entity_ids(registry):
+    """Test that we don't create entity id that is known to be taken."""
+    assert registry.async_generate_entity_id(
+        'light', 'kitchen', {'light.kitchen', 'light.kitchen_2'}) == \
+        'light.kitchen_3'
+
+
+@asyncio.coroutine
+def test_get_or_create_after_entities_replaced(registry):
+    """Test entries are found when the entities have been replaced."""
+    entry = registry.async_get_or_create('light', 'hue', '1234')
+    registry.entities = {entry.entity_id: entry}
+
+    assert registry.async_get_or_create('light', 'hue', '1234') is entry
+    assert len(registry.entities) == 1
+
+
 @asyncio.coroutine
 def test_is_registered(registry):
     """Test that is_registered works."""
@@ -12,6 +12,7 @@ from homeassistant.setup import setup_component
 import homeassistant.core as ha
 from homeassistant.const import MATCH_ALL
 from homeassistant.helpers.event import (
+    DATA_POINT_IN_TIME_SCHEDULER,
     async_call_later,
     track_point_in_utc_time,
     track_point_in_time,
@@ -84,6 +85,39 @@ class TestEventHelpers(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(2, len(runs))
 
+    def test_track_point_in_time_scheduler(self):
+        """Test pending points in time share a single listener."""
+        start = datetime(2018, 4, 20, 12, 0, 0, tzinfo=dt_util.UTC)
+        runs = []
+
+        init_count = sum(self.hass.bus.listeners.values())
+
+        unsubs = [
+            track_point_in_utc_time(
+                self.hass, callback(lambda now, idx=idx: runs.append(idx)),
+                start + timedelta(seconds=idx))
+            for idx in range(10)]
+
+        self.assertEqual(init_count + 1,
+                         sum(self.hass.bus.listeners.values()))
+        scheduler = self.hass.data[DATA_POINT_IN_TIME_SCHEDULER]
+        self.assertEqual(10, len(scheduler))
+
+        unsubs[3]()
+        self._send_time_changed(start + timedelta(seconds=5))
+        self.hass.block_till_done()
+        self.assertEqual([0, 1, 2, 4, 5], runs)
+        self.assertEqual(4, len(scheduler))
+
+        # Cancelling already executed actions does nothing
+        unsubs[0]()
+        self.assertEqual(4, len(scheduler))
+
+        for unsub in unsubs[6:]:
+            unsub()
+        self.assertEqual(0, len(scheduler))
+        self.assertEqual(init_count, sum(self.hass.bus.listeners.values()))
+
     def test_track_time_change(self):
         """Test tracking time change."""
         wildcard_runs = []
@@ -195,6 +229,44 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(5, len(wildcard_runs))
         self.assertEqual(6, len(wildercard_runs))
 
+    def test_track_state_change_dispatch(self):
+        """Test state changes only reach listeners of that entity."""
+        kitchen_runs = []
+        bowl_runs = []
+        all_runs = []
+
+        init_count = sum(self.hass.bus.listeners.values())
+
+        unsub_kitchen = track_state_change(
+            self.hass, ['light.Kitchen', 'light.kitchen'],
+            ha.callback(lambda *args: kitchen_runs.append(args)))
+        unsub_bowl = track_state_change(
+            self.hass, 'light.bowl',
+            ha.callback(lambda *args: bowl_runs.append(args)))
+        unsub_all = track_state_change(
+            self.hass, MATCH_ALL,
+            ha.callback(lambda *args: all_runs.append(args)))
+
+        # All trackers share a single bus listener
+        self.assertEqual(init_count + 1,
+                         sum(self.hass.bus.listeners.values()))
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(kitchen_runs))
+        self.assertEqual(0, len(bowl_runs))
+        self.assertEqual(1, len(all_runs))
+
+        unsub_kitchen()
+        self.hass.states.set('light.kitchen', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(kitchen_runs))
+        self.assertEqual(2, len(all_runs))
+
+        unsub_bowl()
+        unsub_all()
+        self.assertEqual(init_count, sum(self.hass.bus.listeners.values()))
+
     def test_track_template(self):
         """Test tracking template."""
         specific_runs = []
@@ -0,0 +1,121 @@
+"""Test the event hub helper."""
+import json
+from unittest.mock import patch
+
+from homeassistant.const import EVENT_TIME_CHANGED, MATCH_ALL
+from homeassistant.core import callback
+from homeassistant.helpers.event_hub import async_get_event_hub
+
+
+async def test_event_serialized_once(hass):
+    """Test all subscribers share a single encoding of an event."""
+    hub = async_get_event_hub(hass)
+    received = []
+
+    @callback
+    def target(serialized):
+        """Collect the event JSON."""
+        received.append(serialized.json)
+        return True
+
+    hub.async_subscribe(MATCH_ALL, target)
+    hub.async_subscribe(MATCH_ALL, target)
+    hub.async_subscribe('test_event', target)
+
+    with patch('homeassistant.helpers.event_hub.json.dumps',
+               side_effect=json.dumps) as mock_dumps:
+        hass.bus.async_fire('test_event', {'hello': 'world'})
+        await hass.async_block_till_done()
+
+    assert mock_dumps.call_count == 1
+    assert len(received) == 3
+    assert received[0] is received[1] is received[2]
+    assert json.loads(received[0])['data'] == {'hello': 'world'}
+
+
+async def test_unserializable_event_skipped(hass, caplog):
+    """Test an event that can't be serialized is only skipped."""
+    hub = async_get_event_hub(hass)
+    received = []
+
+    @callback
+    def target(serialized):
+        """Collect the event type of events that can be encoded."""
+        if serialized.json is None:
+            return None
+        received.append(serialized.event.event_type)
+        return True
+
+    first = hub.async_subscribe(MATCH_ALL, target)
+    second = hub.async_subscribe(MATCH_ALL, target)
+
+    with patch('homeassistant.helpers.event_hub.json.dumps',
+               side_effect=json.dumps) as mock_dumps:
+        hass.bus.async_fire('bad_event', {'value': object()})
+        hass.bus.async_fire('good_event')
+        await hass.async_block_till_done()
+
+    assert mock_dumps.call_count == 2
+    assert received == ['good_event', 'good_event']
+    assert first.delivered == second.delivered == 1
+    assert caplog.text.count('Unable to serialize to JSON') == 1
+
+
+async def test_event_not_serialized_without_json_access(hass):
+    """Test events are only encoded when a subscriber asks for the JSON."""
+    hub = async_get_event_hub(hass)
+
+    @callback
+    def target(serialized):
+        """Ignore all events."""
+        return None
+
+    hub.async_subscribe(MATCH_ALL, target)
+
+    with patch('homeassistant.helpers.event_hub.json.dumps') as mock_dumps:
+        hass.bus.async_fire('test_event', {'hello': 'world'})
+        await hass.async_block_till_done()
+
+    assert mock_dumps.call_count == 0
+
+
+async def test_subscription_counters(hass):
+    """Test delivered and dropped events are counted per subscription."""
+    hub = async_get_event_hub(hass)
+    results = [True, False, None]
+
+    @callback
+    def target(serialized):
+        """Accept, drop and ignore events in turn."""
+        return results.pop(0)
+
+    subscription = hub.async_subscribe('test_event', target)
+
+    for _ in range(3):
+        hass.bus.async_fire('test_event')
+    hass.bus.async_fire(EVENT_TIME_CHANGED)
+    await hass.async_block_till_done()
+
+    assert subscription.delivered == 1
+    assert subscription.dropped == 1
+    assert hub.subscriptions == [subscription]
+
+
+async def test_unsubscribe_removes_listener(hass):
+    """Test the bus listener is removed with the last subscription."""
+    hub = async_get_event_hub(hass)
+    calls = []
+
+    first = hub.async_subscribe('test_event', calls.append)
+    second = hub.async_subscribe('test_event', calls.append)
+    assert hass.bus.async_listeners()['test_event'] == 1
+
+    first.async_unsubscribe()
+    hass.bus.async_fire('test_event')
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+    assert hass.bus.async_listeners()['test_event'] == 1
+
+    second.async_unsubscribe()
+    assert 'test_event' not in hass.bus.async_listeners()
+    assert hub.subscriptions == []
@@ -1,15 +1,21 @@
 """The tests for the Restore component."""
 import asyncio
+import json
 from datetime import timedelta
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 from homeassistant.setup import setup_component
-from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP)
 from homeassistant.core import CoreState, split_entity_id, State
 import homeassistant.util.dt as dt_util
 from homeassistant.components import input_boolean, recorder
 from homeassistant.helpers.restore_state import (
-    async_get_last_state, DATA_RESTORE_CACHE)
+    async_get_last_state, async_restore_state, DATA_RESTORE_CACHE,
+    DATA_SNAPSHOT_TRACKER)
+from homeassistant.remote import JSONEncoder
 from homeassistant.components.recorder.models import RecorderRuns, States
 
 from tests.common import (
@@ -17,6 +23,15 @@ from tests.common import (
     mock_component)
 
 
+@pytest.fixture(autouse=True)
+def snapshot_path(tmpdir):
+    """Write restore state snapshots to a temporary directory."""
+    path = str(tmpdir.join('restore_state.json'))
+    with patch('homeassistant.helpers.restore_state.RESTORE_STATE_FILE',
+               path):
+        yield path
+
+
 @asyncio.coroutine
 def test_caching_data(hass):
     """Test that we cache data."""
@@ -188,3 +203,142 @@ def test_filling_the_cache():
     assert state.state == 'off'
 
     hass.stop()
+
+
+@asyncio.coroutine
+def test_loading_from_snapshot(hass, snapshot_path):
+    """Test that the snapshot is used instead of querying the recorder."""
+    mock_component(hass, 'recorder')
+    hass.state = CoreState.starting
+
+    states = [
+        State('input_boolean.b0', 'on'),
+        State('input_boolean.b1', 'off', {'friendly_name': 'B1'}),
+    ]
+
+    with open(snapshot_path, 'w') as fdesc:
+        json.dump(states, fdesc, cls=JSONEncoder)
+
+    last_run = MagicMock(
+        start=dt_util.utcnow().replace(tzinfo=None) - timedelta(hours=1),
+        end=dt_util.utcnow(), closed_incorrect=False)
+
+    with patch('homeassistant.helpers.restore_state.last_recorder_run',
+               return_value=last_run), \
+            patch('homeassistant.helpers.restore_state.get_states') \
+            as mock_get_states, \
+            patch('homeassistant.helpers.restore_state.wait_connection_ready',
+                  return_value=mock_coro(True)):
+        state = yield from async_get_last_state(hass, 'input_boolean.b1')
+
+    assert not mock_get_states.called
+    assert state == states[1]
+    assert hass.data[DATA_RESTORE_CACHE] == {st.entity_id: st for st in states}
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from hass.async_block_till_done()
+
+    assert DATA_RESTORE_CACHE not in hass.data
+
+
+@pytest.mark.parametrize('start_offset, closed_incorrect', [
+    (timedelta(hours=1), False),
+    (timedelta(hours=-1), True),
+])
+@asyncio.coroutine
+def test_outdated_snapshot_falls_back_to_recorder(
+        hass, snapshot_path, start_offset, closed_incorrect):
+    """Test a snapshot older than the last recorder run is ignored."""
+    mock_component(hass, 'recorder')
+    hass.state = CoreState.starting
+
+    with open(snapshot_path, 'w') as fdesc:
+        json.dump([State('input_boolean.b1', 'off')], fdesc,
+                  cls=JSONEncoder)
+
+    states = [State('input_boolean.b1', 'on')]
+    last_run = MagicMock(
+        start=dt_util.utcnow().replace(tzinfo=None) + start_offset,
+        end=dt_util.utcnow() + timedelta(hours=2),
+        closed_incorrect=closed_incorrect)
+
+    with patch('homeassistant.helpers.restore_state.last_recorder_run',
+               return_value=last_run), \
+            patch('homeassistant.helpers.restore_state.get_states',
+                  return_value=states), \
+            patch('homeassistant.helpers.restore_state.wait_connection_ready',
+                  return_value=mock_coro(True)):
+        state = yield from async_get_last_state(hass, 'input_boolean.b1')
+
+    assert state == states[0]
+
+
+@asyncio.coroutine
+def test_invalid_snapshot_falls_back_to_recorder(hass, snapshot_path):
+    """Test that an unreadable snapshot falls back to the recorder."""
+    mock_component(hass, 'recorder')
+    hass.state = CoreState.starting
+
+    with open(snapshot_path, 'w') as fdesc:
+        fdesc.write('not json')
+
+    states = [State('input_boolean.b1', 'on')]
+
+    with patch('homeassistant.helpers.restore_state.last_recorder_run',
+               return_value=MagicMock(end=dt_util.utcnow())), \
+            patch('homeassistant.helpers.restore_state.get_states',
+                  return_value=states), \
+            patch('homeassistant.helpers.restore_state.wait_connection_ready',
+                  return_value=mock_coro(True)):
+        state = yield from async_get_last_state(hass, 'input_boolean.b1')
+
+    assert state == states[0]
+
+
+@asyncio.coroutine
+def test_snapshot_saved_on_stop(hass, snapshot_path):
+    """Test that the states are written to the snapshot when stopping."""
+    mock_component(hass, 'recorder')
+    hass.state = CoreState.starting
+
+    with patch('homeassistant.helpers.restore_state.last_recorder_run',
+               return_value=None), \
+            patch('homeassistant.helpers.restore_state.wait_connection_ready',
+                  return_value=mock_coro(True)):
+        yield from async_get_last_state(hass, 'input_boolean.b1')
+
+    hass.data[recorder.DATA_INSTANCE] = MagicMock(
+        entity_filter=lambda entity_id: entity_id != 'sensor.excluded')
+    hass.states.async_set('input_boolean.b1', 'on', {'friendly_name': 'B1'})
+    hass.states.async_set('sensor.unserializable', 'on', {'obj': object()})
+    hass.states.async_set('sensor.excluded', 'on')
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    yield from hass.async_block_till_done()
+
+    with open(snapshot_path) as fdesc:
+        data = json.load(fdesc)
+
+    assert [State.from_dict(state) for state in data] == \
+        [hass.states.get('input_boolean.b1')]
+
+
+@asyncio.coroutine
+def test_snapshot_tracked_when_running(hass, snapshot_path):
+    """Test snapshots are saved even if no state was restored on startup."""
+    mock_component(hass, 'recorder')
+    entity = MagicMock(hass=hass, entity_id='input_boolean.b1')
+
+    yield from async_restore_state(entity, lambda state: {})
+
+    assert DATA_SNAPSHOT_TRACKER in hass.data
+    assert not entity.async_restore_state.called
+
+    hass.states.async_set('input_boolean.b1', 'on')
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    yield from hass.async_block_till_done()
+
+    with open(snapshot_path) as fdesc:
+        data = json.load(fdesc)
+
+    assert [State.from_dict(state) for state in data] == \
+        [hass.states.get('input_boolean.b1')]
@@ -1,6 +1,7 @@
 """Test to verify that Home Assistant core works."""
 # pylint: disable=protected-access
 import asyncio
+import json
 import logging
 import os
 import unittest
@@ -10,6 +11,7 @@ from tempfile import TemporaryDirectory
 
 import pytz
 import pytest
+import voluptuous as vol
 
 import homeassistant.core as ha
 from homeassistant.exceptions import (InvalidEntityFormatError,
@@ -20,7 +22,8 @@ from homeassistant.util.unit_system import (METRIC_SYSTEM)
 from homeassistant.const import (
     __version__, EVENT_STATE_CHANGED, ATTR_FRIENDLY_NAME, CONF_UNIT_SYSTEM,
     ATTR_NOW, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
-    EVENT_HOMEASSISTANT_CLOSE, EVENT_SERVICE_REGISTERED, EVENT_SERVICE_REMOVED)
+    EVENT_HOMEASSISTANT_CLOSE, EVENT_SERVICE_REGISTERED, EVENT_SERVICE_REMOVED,
+    EVENT_CALL_SERVICE, EVENT_SERVICE_EXECUTED)
 
 from tests.common import get_test_home_assistant
 
@@ -93,6 +96,48 @@ def test_async_run_job_delegates_non_async():
     assert len(hass.async_add_job.mock_calls) == 1
 
 
+def test_hass_job_type():
+    """Test that the job type is determined when the job is created."""
+    @asyncio.coroutine
+    def coro_func():
+        pass
+
+    assert ha.HassJob(ha.callback(lambda: None)).job_type == \
+        ha.HassJobType.callback
+    assert ha.HassJob(coro_func).job_type == \
+        ha.HassJobType.coroutinefunction
+    assert ha.HassJob(lambda: None).job_type == ha.HassJobType.executor
+
+    coro = coro_func()
+    with pytest.raises(ValueError):
+        ha.HassJob(coro)
+    coro.close()
+
+
+def test_async_add_hass_job_schedule_callback():
+    """Test that we schedule callback jobs with call_soon."""
+    hass = MagicMock()
+    job = ha.HassJob(ha.callback(MagicMock()))
+
+    ha.HomeAssistant.async_add_hass_job(hass, job)
+    assert len(hass.loop.call_soon.mock_calls) == 1
+    assert len(hass.loop.create_task.mock_calls) == 0
+    assert len(hass.loop.run_in_executor.mock_calls) == 0
+
+
+def test_async_run_hass_job_calls_callback():
+    """Test that callback jobs are called directly."""
+    hass = MagicMock()
+    calls = []
+
+    def job():
+        calls.append(1)
+
+    ha.HomeAssistant.async_run_hass_job(hass, ha.HassJob(ha.callback(job)))
+    assert len(calls) == 1
+    assert len(hass.async_add_hass_job.mock_calls) == 0
+
+
 def test_stage_shutdown():
     """Simulate a shutdown, test calling stuff."""
     hass = get_test_home_assistant()
@@ -412,6 +457,42 @@ class TestEventBus(unittest.TestCase):
         self.hass.block_till_done()
         assert len(coroutine_calls) == 1
 
+    def test_callback_event_listener_called_inline(self):
+        """Test callback listeners are called while the event is fired."""
+        calls = []
+
+        @ha.callback
+        def callback_listener(event):
+            calls.append(event)
+
+        def fire():
+            """Fire the event and check listener was called."""
+            self.bus.async_fire('test_inline')
+            return len(calls)
+
+        self.bus.listen('test_inline', callback_listener)
+        self.bus.listen(ha.MATCH_ALL, callback_listener)
+        assert ha.run_callback_threadsafe(self.hass.loop, fire).result() == 2
+
+    def test_callback_event_listener_exception(self):
+        """Test a failing callback listener does not stop other listeners."""
+        calls = []
+
+        @ha.callback
+        def failing_listener(event):
+            raise ValueError('boom')
+
+        @ha.callback
+        def callback_listener(event):
+            calls.append(event)
+
+        self.bus.listen('test_exception', failing_listener)
+        self.bus.listen('test_exception', callback_listener)
+        with self.assertLogs('homeassistant.core', level='ERROR'):
+            self.bus.fire('test_exception')
+            self.hass.block_till_done()
+        assert len(calls) == 1
+
 
 class TestState(unittest.TestCase):
     """Test State methods."""
@@ -506,11 +587,73 @@ class TestStateMachine(unittest.TestCase):
         self.assertEqual(1, len(ent_ids))
         self.assertTrue('light.bowl' in ent_ids)
 
+    def test_entity_ids_after_remove(self):
+        """Test the entity ids of a domain after adding and removing."""
+        self.states.set('light.kitchen', 'on')
+        self.states.set('light.bowl', 'off')
+        self.assertEqual(['light.bowl', 'light.kitchen'],
+                         self.states.entity_ids('light'))
+
+        self.states.remove('light.bowl')
+        self.assertEqual(['light.kitchen'], self.states.entity_ids('LIGHT'))
+
+        self.states.remove('light.kitchen')
+        self.assertEqual([], self.states.entity_ids('light'))
+
+    def test_available_entity_id(self):
+        """Test generating an entity id that is not in use."""
+        available = self.states.async_available_entity_id
+
+        self.assertEqual('light.kitchen', available('light.kitchen'))
+        self.assertEqual('light.bowl_2', available('light.bowl'))
+
+        self.states.set('light.bowl_2', 'on')
+        self.states.set('light.bowl_3', 'on')
+        self.assertEqual('light.bowl_4', available('light.bowl'))
+        self.assertEqual('light.bowl_5', available(
+            'light.bowl', {'light.bowl_4'}))
+
+        self.states.remove('light.bowl_2')
+        self.assertEqual('light.bowl_2', available('light.bowl'))
+        self.assertEqual('light.bowl_4', available(
+            'light.bowl', ['light.bowl_2']))
+
+    def test_available_entity_id_ignores_earlier_taken(self):
+        """Test ids taken in an earlier call do not affect later calls."""
+        available = self.states.async_available_entity_id
+        self.states.set('sensor.temp', '20')
+
+        self.assertEqual('sensor.temp_3', available(
+            'sensor.temp', {'sensor.temp_2'}))
+        self.assertEqual('sensor.temp_2', available('sensor.temp'))
+
     def test_all(self):
         """Test everything."""
         states = sorted(state.entity_id for state in self.states.all())
         self.assertEqual(['light.bowl', 'switch.ac'], states)
 
+    def test_all_json(self):
+        """Test the JSON of all states follows changes."""
+        def all_json():
+            """Return the decoded JSON of all states."""
+            return {state['entity_id']: state for state in
+                    json.loads(self.states.async_all_json())}
+
+        self.assertEqual('on', all_json()['light.bowl']['state'])
+
+        with patch('homeassistant.core.json.dumps',
+                   side_effect=json.dumps) as mock_dumps:
+            self.states.set('light.bowl', 'off', {'brightness': 10})
+            states = all_json()
+
+        self.assertEqual(1, mock_dumps.call_count)
+        self.assertEqual('off', states['light.bowl']['state'])
+        self.assertEqual({'brightness': 10},
+                         states['light.bowl']['attributes'])
+
+        self.states.remove('switch.ac')
+        self.assertEqual(['light.bowl'], list(all_json()))
+
     def test_remove(self):
         """Test remove method."""
         events = []
@@ -717,6 +860,157 @@ class TestServiceRegistry(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(1, len(calls))
 
+    def test_call_dispatched_directly(self):
+        """Test a call executes once and is still announced on the bus."""
+        calls = []
+        events = []
+
+        @ha.callback
+        def service_handler(call):
+            """Service handler."""
+            calls.append(call)
+
+        @ha.callback
+        def observer(event):
+            """Record the service events."""
+            events.append(event)
+
+        self.services.register('test_domain', 'direct', service_handler)
+        self.hass.bus.listen(EVENT_CALL_SERVICE, observer)
+        self.hass.bus.listen(EVENT_SERVICE_EXECUTED, observer)
+
+        self.assertTrue(self.services.call(
+            'test_domain', 'direct', {'value': 1}, blocking=True))
+        self.hass.block_till_done()
+
+        assert len(calls) == 1
+        assert calls[0].data == {'value': 1}
+        assert [event.event_type for event in events] == [
+            EVENT_CALL_SERVICE, EVENT_SERVICE_EXECUTED]
+        assert events[0].data['service_data'] == {'value': 1}
+        assert events[0].data['service_call_id'] == calls[0].call_id
+        assert events[1].data['service_call_id'] == calls[0].call_id
+
+    def test_call_from_bus_event(self):
+        """Test calls fired on the bus by others are executed."""
+        calls = []
+
+        @ha.callback
+        def service_handler(call):
+            """Service handler."""
+            calls.append(call)
+
+        self.services.register('test_domain', 'remote', service_handler)
+        self.hass.bus.fire(EVENT_CALL_SERVICE, {
+            'domain': 'test_domain', 'service': 'remote',
+            'service_data': {'value': 1}, 'service_call_id': 'remote-1'},
+            ha.EventOrigin.remote)
+        self.hass.block_till_done()
+
+        assert len(calls) == 1
+        assert calls[0].call_id == 'remote-1'
+
+    def test_call_failing_service_with_blocking(self):
+        """Test a blocking call to a failing service returns right away."""
+        def service_handler(call):
+            """Service handler."""
+            raise ValueError('Failed')
+
+        self.services.register('test_domain', 'failing', service_handler)
+
+        with patch.object(ha, 'SERVICE_CALL_LIMIT', 30):
+            assert not self.services.call(
+                'test_domain', 'failing', blocking=True)
+
+    def test_call_validation_cached(self):
+        """Test validated service data is cached per service."""
+        calls = []
+        schema = MagicMock(side_effect=lambda data: dict(data, checked=True))
+
+        @ha.callback
+        def service_handler(call):
+            """Service handler."""
+            calls.append(call)
+
+        self.services.register(
+            'test_domain', 'cached', service_handler, schema=schema,
+            cache_schema=True)
+        service = self.services.services['test_domain']['cached']
+
+        for data in ({'entity_id': ['light.a'], 'brightness': 1},
+                     {'brightness': 1, 'entity_id': ['light.a']},
+                     {'entity_id': ['light.a'], 'brightness': True},
+                     {'entity_id': ['light.a'], 'brightness': 1}):
+            self.services.call('test_domain', 'cached', data, blocking=True)
+
+        assert schema.call_count == 2
+        assert service.cache_hits == 2
+        assert service.cache_misses == 2
+        assert [call.data['brightness'] for call in calls] == [1, 1, True, 1]
+        assert calls[0].data == calls[1].data
+        assert calls[0].data['entity_id'] is not calls[1].data['entity_id']
+
+        # Unhashable data is validated every time
+        self.services.call(
+            'test_domain', 'cached', {'entity_id': {'light.a'}}, blocking=True)
+        assert schema.call_count == 3
+        assert service.cache_misses == 3
+
+    def test_call_validation_not_cached_by_default(self):
+        """Test service data is validated on every call unless opted in."""
+        schema = MagicMock(side_effect=lambda data: dict(data, checked=True))
+
+        self.services.register(
+            'test_domain', 'uncached', ha.callback(lambda call: None),
+            schema=schema)
+        service = self.services.services['test_domain']['uncached']
+
+        for _ in range(2):
+            self.services.call(
+                'test_domain', 'uncached', {'value': 1}, blocking=True)
+
+        assert schema.call_count == 2
+        assert service.cache_hits == 0
+
+    def test_call_validation_cache_nested_copy(self):
+        """Test a handler mutating nested data does not alter the cache."""
+        calls = []
+
+        @ha.callback
+        def service_handler(call):
+            """Record the data and mutate it."""
+            calls.append(call.data['data']['targets'][0])
+            call.data['data']['targets'][0] = 'changed'
+            call.data['data']['title'] = 'changed'
+
+        self.services.register(
+            'test_domain', 'nested', service_handler,
+            schema=vol.Schema({'data': dict}), cache_schema=True)
+        service = self.services.services['test_domain']['nested']
+
+        for _ in range(2):
+            self.services.call('test_domain', 'nested', {
+                'data': {'title': 'hello', 'targets': ['phone']},
+            }, blocking=True)
+
+        assert service.cache_hits == 1
+        assert calls == ['phone', 'phone']
+
+    def test_call_validation_cache_bounded(self):
+        """Test the least recently used validated data is evicted."""
+        self.services.register(
+            'test_domain', 'bounded', ha.callback(lambda call: None),
+            schema=vol.Schema({'value': int}), cache_schema=True)
+        service = self.services.services['test_domain']['bounded']
+
+        with patch.object(ha, 'SERVICE_SCHEMA_CACHE_SIZE', 2):
+            for value in (1, 2, 1, 3, 2, 1):
+                self.services.call(
+                    'test_domain', 'bounded', {'value': value}, blocking=True)
+
+        assert service.cache_hits == 1
+        assert service.cache_misses == 5
+
     def test_remove_service(self):
         """Test remove service."""
         calls_remove = []
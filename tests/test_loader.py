@@ -2,6 +2,7 @@
 # pylint: disable=protected-access
 import asyncio
 import unittest
+from unittest.mock import patch
 
 import pytest
 
@@ -103,3 +104,58 @@ def test_helpers_wrapper(hass):
     yield from hass.async_block_till_done()
 
     assert result == ['hello']
+
+
+def test_get_component_metadata_without_import(hass):
+    """Test the metadata of a component is read without importing it."""
+    with patch.dict(loader._COMPONENT_CACHE, clear=True), \
+            patch.dict(loader._METADATA_CACHE, clear=True), \
+            patch('homeassistant.loader.importlib.import_module') \
+            as mock_import:
+        metadata = loader.get_component_metadata('api')
+        custom_metadata = loader.get_component_metadata('switch.test')
+
+    assert not mock_import.called
+    assert metadata == {
+        loader.METADATA_DEPENDENCIES: ['http'],
+        loader.METADATA_REQUIREMENTS: [],
+    }
+    assert custom_metadata == {
+        loader.METADATA_DEPENDENCIES: [],
+        loader.METADATA_REQUIREMENTS: [],
+    }
+
+
+def test_get_component_metadata_loaded(hass):
+    """Test the metadata of a loaded component comes from the module."""
+    loader.set_component('mod1', MockModule(
+        'mod1', dependencies=['mod2'], requirements=['package==1.0']))
+
+    assert loader.get_component_metadata('mod1') == {
+        loader.METADATA_DEPENDENCIES: ['mod2'],
+        loader.METADATA_REQUIREMENTS: ['package==1.0'],
+    }
+    assert loader.get_component_metadata('no_such_component') is None
+
+
+def test_read_metadata(tmpdir):
+    """Test reading the metadata from the source of a module."""
+    def read(source):
+        """Read the metadata of the source."""
+        path = tmpdir.join('module.py')
+        path.write(source)
+        return loader._read_metadata(str(path))
+
+    assert read("DEPENDENCIES = ['http']\nREQUIREMENTS = ('lib==1',)\n") == {
+        loader.METADATA_DEPENDENCIES: ['http'],
+        loader.METADATA_REQUIREMENTS: ['lib==1'],
+    }
+    assert read("import os\n") == {
+        loader.METADATA_DEPENDENCIES: [],
+        loader.METADATA_REQUIREMENTS: [],
+    }
+    assert read("DEPENDENCIES = [DOMAIN]\n") is None
+    assert read("if True:\n    DEPENDENCIES = ['http']\n") is None
+    assert read("DEPENDENCIES = ['http']\nDEPENDENCIES += ['api']\n") \
+        is None
+    assert read("DEPENDENCIES = [\n") is None
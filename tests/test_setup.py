@@ -6,6 +6,8 @@ from unittest import mock
 import threading
 import logging
 
+from async_timeout import timeout
+
 import voluptuous as vol
 
 from homeassistant.core import callback
@@ -18,7 +20,7 @@ from homeassistant.helpers import discovery
 
 from tests.common import \
     get_test_home_assistant, MockModule, MockPlatform, \
-    assert_setup_component, get_test_config_dir
+    assert_setup_component, get_test_config_dir, mock_coro_func
 
 ORIG_TIMEZONE = dt_util.DEFAULT_TIME_ZONE
 VERSION_PATH = os.path.join(get_test_config_dir(), config_util.VERSION_FILE)
@@ -438,3 +440,154 @@ def test_platform_no_warn_slow(hass):
             hass, 'test_component1', {})
         assert result
         assert not mock_call.called
+
+
+@asyncio.coroutine
+def test_setup_components_after_dependencies(hass):
+    """Test components are set up after their dependencies."""
+    order = []
+
+    def mock_module(domain, dependencies=None):
+        """Register a component recording when it is set up."""
+        @asyncio.coroutine
+        def async_setup(hass, config):
+            """Record the setup and yield to the other setups."""
+            order.append(domain)
+            yield from asyncio.sleep(0, loop=hass.loop)
+            return True
+
+        loader.set_component(domain, MockModule(
+            domain, dependencies=dependencies, async_setup=async_setup))
+
+    mock_module('comp_a', ['comp_b'])
+    mock_module('comp_b', ['comp_c'])
+    mock_module('comp_c')
+    mock_module('comp_d')
+
+    result = yield from setup.async_setup_components(
+        hass, ['comp_a', 'comp_d'], {})
+
+    assert result == {'comp_a': True, 'comp_b': True,
+                      'comp_c': True, 'comp_d': True}
+    assert order.index('comp_c') < order.index('comp_b') < \
+        order.index('comp_a')
+
+
+@asyncio.coroutine
+def test_setup_components_first(hass):
+    """Test the first components are set up before the others."""
+    order = []
+
+    def mock_module(domain, dependencies=None):
+        """Register a component recording when it is set up."""
+        def setup_component(hass, config):
+            """Record the setup."""
+            order.append(domain)
+            return True
+
+        loader.set_component(domain, MockModule(
+            domain, dependencies=dependencies, setup=setup_component))
+
+    mock_module('comp_first', ['comp_dep'])
+    mock_module('comp_dep')
+    mock_module('comp_other')
+
+    result = yield from setup.async_setup_components(
+        hass, ['comp_other', 'comp_first'], {}, first=['comp_first'])
+
+    assert all(result.values())
+    assert order == ['comp_dep', 'comp_first', 'comp_other']
+
+
+@asyncio.coroutine
+def test_setup_components_max_concurrent(hass):
+    """Test the number of setups running at the same time is limited."""
+    running = []
+    max_running = 0
+
+    @asyncio.coroutine
+    def async_setup(hass, config):
+        """Track how many setups are running."""
+        nonlocal max_running
+        running.append(config)
+        max_running = max(max_running, len(running))
+        yield from asyncio.sleep(0, loop=hass.loop)
+        running.remove(config)
+        return True
+
+    domains = ['comp_{}'.format(idx) for idx in range(5)]
+    for domain in domains:
+        loader.set_component(domain, MockModule(
+            domain, async_setup=async_setup))
+
+    result = yield from setup.async_setup_components(
+        hass, domains, {}, max_concurrent=2)
+
+    assert all(result.values())
+    assert max_running == 2
+
+
+@asyncio.coroutine
+def test_setup_components_failed_dependency(hass):
+    """Test a failed dependency fails the components depending on it."""
+    loader.set_component('comp_a', MockModule(
+        'comp_a', dependencies=['comp_b']))
+    loader.set_component('comp_b', MockModule(
+        'comp_b', async_setup=mock_coro_func(False)))
+
+    result = yield from setup.async_setup_components(hass, ['comp_a'], {})
+
+    assert result == {'comp_a': False, 'comp_b': False}
+    assert 'comp_a' not in hass.config.components
+
+
+@asyncio.coroutine
+def test_setup_components_circular_dependency(hass):
+    """Test mutually dependent components fail instead of waiting."""
+    loader.set_component('comp_a', MockModule(
+        'comp_a', dependencies=['comp_b']))
+    loader.set_component('comp_b', MockModule(
+        'comp_b', dependencies=['comp_a']))
+    loader.set_component('comp_c', MockModule('comp_c'))
+
+    with timeout(5, loop=hass.loop):
+        result = yield from setup.async_setup_components(
+            hass, ['comp_a', 'comp_b', 'comp_c'], {})
+
+    assert result == {'comp_a': False, 'comp_b': False, 'comp_c': True}
+
+
+@asyncio.coroutine
+def test_setup_timeline(hass):
+    """Test the setup of components is recorded in the timeline."""
+    loader.set_component('comp_a', MockModule(
+        'comp_a', dependencies=['comp_b']))
+    loader.set_component('comp_b', MockModule('comp_b'))
+
+    assert setup.async_get_timeline(hass) == []
+
+    yield from setup.async_setup_component(hass, 'comp_a', {})
+
+    timeline = setup.async_get_timeline(hass)
+
+    assert [(entry['name'], entry['phase']) for entry in timeline] == [
+        ('comp_b', setup.PHASE_SETUP),
+        ('comp_a', setup.PHASE_SETUP),
+    ]
+    assert timeline[0]['start'] == 0
+    assert all(entry['duration'] >= 0 for entry in timeline)
+
+
+@asyncio.coroutine
+def test_setup_timeline_stops_after_start(hass):
+    """Test setups after Home Assistant has started are not recorded."""
+    loader.set_component('comp_a', MockModule('comp_a'))
+    loader.set_component('comp_b', MockModule('comp_b'))
+
+    yield from setup.async_setup_component(hass, 'comp_a', {})
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from hass.async_block_till_done()
+    yield from setup.async_setup_component(hass, 'comp_b', {})
+
+    assert [entry['name'] for entry in setup.async_get_timeline(hass)] == [
+        'comp_a']
@@ -426,3 +426,42 @@ def test_duplicate_key(caplog):
     with patch_yaml_files(files):
         load_yaml_config_file(YAML_CONFIG_FILE)
     assert 'contains duplicate key' in caplog.text
+
+
+def test_parsed_file_cached():
+    """Test files are only parsed again when their content changed."""
+    files = {YAML_CONFIG_FILE: 'key:\n  - value\nother: !include other.yaml',
+             'other.yaml': 'nested: value'}
+    yaml.clear_yaml_cache()
+
+    with patch_yaml_files(files), \
+            patch('homeassistant.util.yaml._NODE_LOADER',
+                  wraps=yaml._NODE_LOADER) as mock_loader:
+        first = yaml.load_yaml(YAML_CONFIG_FILE)
+        assert mock_loader.call_count == 2
+
+        first['key'].append('changed')
+        second = yaml.load_yaml(YAML_CONFIG_FILE)
+        assert mock_loader.call_count == 2
+        assert second == {'key': ['value'], 'other': {'nested': 'value'}}
+
+        files['other.yaml'] = 'nested: changed'
+        third = yaml.load_yaml(YAML_CONFIG_FILE)
+        assert mock_loader.call_count == 3
+        assert third == {'key': ['value'], 'other': {'nested': 'changed'}}
+
+
+def test_secrets_file_not_cached():
+    """Test the secrets file is never kept in the parsed file cache."""
+    files = {YAML_CONFIG_FILE: 'password: !secret pw',
+             yaml.SECRET_YAML: 'pw: abc123'}
+    yaml.clear_yaml_cache()
+    yaml.clear_secret_cache()
+
+    with patch_yaml_files(files):
+        assert yaml.load_yaml(YAML_CONFIG_FILE) == {'password': 'abc123'}
+
+    yaml.clear_secret_cache()
+
+    assert list(yaml._NODE_CACHE) == [YAML_CONFIG_FILE]
+    assert 'abc123' not in repr(yaml._NODE_CACHE)